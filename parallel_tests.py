@@ -0,0 +1,150 @@
+"""
+Параллельный запуск тестов проектов.
+
+Тесты каждого проекта делятся на --workers частей, и все части всех
+проектов выполняются одновременно отдельными процессами pytest.
+У каждого процесса своя тестовая база SQLite в памяти; схема
+не мигрируется заново, а копируется из снимка (см. DatabaseCreation
+в yanews/sqlite3 и yanote/sqlite3). Вывод частей печатается после
+завершения, вместе со списком самых медленных тестов по отчётам
+junitxml. Запуск из корня репозитория:
+
+    python parallel_tests.py
+    python parallel_tests.py ya_news --workers 4
+
+Этот же модуль подключается к процессам pytest как плагин
+(-p parallel_tests) и оставляет в части только её тесты.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from xml.etree import ElementTree
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECTS = ('ya_news', 'ya_note')
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--shard',
+        help='Номер части и число частей, например 2/4: часть получает '
+             'каждый четвёртый тест, начиная со второго.'
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    shard = config.getoption('shard')
+    if not shard:
+        return
+    number, count = map(int, shard.split('/'))
+    selected, deselected = [], []
+    for index, item in enumerate(items):
+        (selected if index % count == number - 1 else deselected).append(item)
+    config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        'projects', nargs='*', help=f'По умолчанию: {", ".join(PROJECTS)}.'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=max(1, min(4, os.cpu_count() // 2)),
+        help='Число процессов pytest на проект.'
+    )
+    parser.add_argument(
+        '--slowest', type=int, default=10,
+        help='Сколько самых медленных тестов показать.'
+    )
+    args = parser.parse_args()
+    unknown = set(args.projects) - set(PROJECTS)
+    if unknown:
+        parser.error(f'Неизвестные проекты: {", ".join(sorted(unknown))}')
+    return args
+
+
+def start_shard(project, number, count, directory):
+    """Процесс pytest для одной части тестов проекта."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, (str(BASE_DIR), env.get('PYTHONPATH')))
+    )
+    name = f'{project}-{number}'
+    log = open(directory / f'{name}.log', 'w+')
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'pytest', '-p', 'parallel_tests',
+            f'--shard={number}/{count}', '--tb=short',
+            f'--junitxml={directory / f"{name}.xml"}',
+        ],
+        cwd=BASE_DIR / project,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    return name, process, log
+
+
+def read_timings(path):
+    """Время каждого теста из отчёта junitxml."""
+    if not path.exists():
+        return []
+    return [
+        (float(case.get('time', 0)), f'{case.get("classname")}::'
+                                     f'{case.get("name")}')
+        for case in ElementTree.parse(path).iter('testcase')
+    ]
+
+
+def main():
+    args = parse_args()
+    projects = args.projects or PROJECTS
+    started = time.monotonic()
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        shards = [
+            (project, *start_shard(project, number, args.workers, directory))
+            for project in projects
+            for number in range(1, args.workers + 1)
+        ]
+        failed = set()
+        report = []
+        timings = []
+        for project, name, process, log in shards:
+            if process.wait():
+                failed.add(project)
+                log.seek(0)
+                report.append(f'\n===== {name} =====\n{log.read()}')
+            log.close()
+            timings += [
+                (seconds, f'{project}/{test}')
+                for seconds, test in read_timings(directory / f'{name}.xml')
+            ]
+    elapsed = time.monotonic() - started
+    report.append(
+        f'\nТестов: {len(timings)}, время: {elapsed:.1f} с '
+        f'(последовательно {sum(seconds for seconds, _ in timings):.1f} с), '
+        f'процессов: {len(shards)}.'
+    )
+    if args.slowest:
+        report.append('Самые медленные тесты:')
+        report += [
+            f'{seconds:8.2f} с  {test}'
+            for seconds, test in sorted(timings, reverse=True)[:args.slowest]
+        ]
+    for project in projects:
+        status = 'упали тесты' if project in failed else 'тесты прошли'
+        report.append(f'{project}: {status}')
+    # Одна запись, чтобы отчёты нескольких запусков не перемешивались.
+    sys.stdout.write('\n'.join(report) + '\n')
+    sys.stdout.flush()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
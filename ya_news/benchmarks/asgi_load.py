@@ -0,0 +1,177 @@
+"""
+Нагрузочный тест синхронных и асинхронных страниц ya_news.
+
+Приложение ASGI вызывается напрямую в том же процессе, без сервера.
+Каждый режим запускается в отдельном процессе со своей временной базой.
+Запуск из каталога ya_news:
+
+    python -m benchmarks.asgi_load --concurrency 100 500 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ('sync', 'async')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[100, 500, 1000]
+    )
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--news', type=int, default=100)
+    parser.add_argument('--comments', type=int, default=50)
+    parser.add_argument(
+        '--page-cache',
+        action='store_true',
+        help='Не отключать кеш страниц для анонимных пользователей.'
+    )
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def setup_django(args, db_path):
+    """Настраивает Django на временную базу и заполняет её данными."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    os.environ['YANEWS_ASYNC_VIEWS'] = str(args.mode == 'async')
+    import django
+    from django.conf import settings
+    django.setup()
+    settings.DATABASES['default']['NAME'] = db_path
+    if not args.page_cache:
+        settings.PAGE_CACHE_TIMEOUT = 0
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from news.models import Comment, News, make_teaser
+    call_command('migrate', verbosity=0)
+    author = get_user_model().objects.create(username='benchmark')
+    text = 'Просто текст. ' * 50
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text=text, teaser=make_teaser(text))
+        for index in range(args.news)
+    )
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    Comment.objects.bulk_create(
+        Comment(news_id=news_id, author=author, text=f'Комментарий {index}')
+        for news_id in news_ids
+        for index in range(args.comments)
+    )
+    return news_ids
+
+
+async def call_asgi(application, path):
+    """Выполняет один GET-запрос к приложению ASGI, возвращает статус."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = None
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def run_level(application, paths, concurrency, total):
+    """Выполняет total запросов, не больше concurrency одновременно."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(path):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            status = await call_asgi(application, path)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(one(paths[index % len(paths)]) for index in range(total))
+    )
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'rps': total / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'errors': errors,
+    }
+
+
+def run_mode(args):
+    """Тело дочернего процесса: прогон всех уровней нагрузки."""
+    with tempfile.TemporaryDirectory() as directory:
+        news_ids = setup_django(args, os.path.join(directory, 'db.sqlite3'))
+        from django.core.asgi import get_asgi_application
+        from django.urls import reverse
+        application = get_asgi_application()
+        paths = [reverse('news:home')] + [
+            reverse('news:detail', args=(pk,)) for pk in news_ids
+        ]
+        for concurrency in args.concurrency:
+            result = asyncio.run(
+                run_level(application, paths, concurrency, args.requests)
+            )
+            print(json.dumps(result))
+
+
+def main():
+    args = parse_args()
+    if args.mode:
+        run_mode(args)
+        return
+    print(
+        f'{"режим":>6} {"клиентов":>9} {"запр./с":>9} '
+        f'{"p50, мс":>9} {"p95, мс":>9} {"ошибок":>7}'
+    )
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.asgi_load', '--mode', mode]
+            + sys.argv[1:],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for line in output.splitlines():
+            result = json.loads(line)
+            print(
+                f'{mode:>6} {result["concurrency"]:>9} '
+                f'{result["rps"]:>9.0f} {result["p50_ms"]:>9.1f} '
+                f'{result["p95_ms"]:>9.1f} {result["errors"]:>7}'
+            )
+
+
+if __name__ == '__main__':
+    main()
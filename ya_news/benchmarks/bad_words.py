@@ -0,0 +1,70 @@
+"""
+Сравнение проверки запрещённых слов: перебор слов и скомпилированное
+выражение. Запуск из каталога ya_news:
+
+    python -m benchmarks.bad_words
+"""
+import random
+import timeit
+
+from news.moderation import compile_words_pattern
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+WORDS_COUNT = 10_000
+COMMENT_SIZE = 10 * 1024
+REPEAT = 5
+
+
+def random_word(rng, min_length, max_length):
+    length = rng.randint(min_length, max_length)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def make_comment(rng, size):
+    words = []
+    length = 0
+    while length < size:
+        word = random_word(rng, 2, 4)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def naive_search(words, text):
+    lowered_text = text.lower()
+    return any(word in lowered_text for word in words)
+
+
+def main():
+    rng = random.Random(0)
+    words = [random_word(rng, 6, 12) for _ in range(WORDS_COUNT)]
+    clean_comment = make_comment(rng, COMMENT_SIZE)
+    dirty_comment = clean_comment[:-20] + ' ' + words[-1]
+    build_time = timeit.timeit(
+        lambda: compile_words_pattern(words), number=1
+    )
+    pattern = compile_words_pattern(words)
+    print(f'{WORDS_COUNT} слов, комментарий {COMMENT_SIZE} байт')
+    print(f'Компиляция выражения: {build_time * 1000:.1f} мс')
+    for name, comment in (
+        ('без нарушений', clean_comment),
+        ('слово в конце', dirty_comment),
+    ):
+        assert naive_search(words, comment) == bool(
+            pattern.search(comment.lower())
+        )
+        naive = min(timeit.repeat(
+            lambda: naive_search(words, comment), number=1, repeat=REPEAT
+        ))
+        compiled = min(timeit.repeat(
+            lambda: pattern.search(comment.lower()), number=1, repeat=REPEAT
+        ))
+        print(
+            f'{name}: перебор {naive * 1000:.2f} мс, '
+            f'выражение {compiled * 1000:.2f} мс, '
+            f'ускорение x{naive / compiled:.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
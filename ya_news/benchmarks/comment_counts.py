@@ -0,0 +1,123 @@
+"""
+Время и память подсчёта комментариев для новостей главной страницы.
+
+Сравниваются три способа: загрузка всех комментариев через
+prefetch_related (как было до аннотации), Count с GROUP BY по новостям
+и запрос NewsList.get_queryset: подзапрос для числа комментариев и ещё
+один — для времени последнего комментария. Для каждого способа
+печатаются p50/p95 времени, число запросов и пик выделенной памяти
+(tracemalloc). Данные — синтетические (news.synthetic), большая часть
+комментариев приходится на свежие новости, то есть на главную.
+Запуск из каталога ya_news:
+
+    python -m benchmarks.comment_counts --news 1000 --comments 100000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+MEMORY_REPEAT = 5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    return parser.parse_args()
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    from django.conf import settings
+    django.setup()
+    settings.DATABASES['default']['NAME'] = db_path
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_variants():
+    """Способы получить новости главной с числом комментариев."""
+    from django.conf import settings
+    from django.db.models import Count
+
+    from news.models import News
+    from news.views import NewsList
+    page_size = settings.NEWS_COUNT_ON_HOME_PAGE
+
+    def prefetch():
+        news_list = News.objects.prefetch_related(
+            'comment_set'
+        )[:page_size]
+        return [len(news.comment_set.all()) for news in news_list]
+
+    def group_by():
+        news_list = News.objects.annotate(
+            comment_count=Count('comment')
+        )[:page_size]
+        return [news.comment_count for news in news_list]
+
+    def subquery():
+        return [news.comment_count for news in NewsList().get_queryset()]
+
+    return {
+        'prefetch_related': prefetch,
+        'Count, GROUP BY': group_by,
+        'подзапрос (NewsList)': subquery,
+    }
+
+
+def measure(func, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    with CaptureQueriesContext(connection) as queries:
+        counts = func()
+    peaks = []
+    for _ in range(MEMORY_REPEAT):
+        tracemalloc.start()
+        func()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        'p50': statistics.median(timings),
+        'p95': statistics.quantiles(timings, n=20)[-1],
+        'queries': len(queries),
+        'memory': min(peaks),
+        'counts': counts,
+    }
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'db.sqlite3'))
+        from news.synthetic import generate
+        generate(users=args.users, news=args.news, comments=args.comments)
+        results = {
+            name: measure(func, args.repeat)
+            for name, func in make_variants().items()
+        }
+    counts = {tuple(result['counts']) for result in results.values()}
+    assert len(counts) == 1, 'Способы дают разное число комментариев.'
+    print(f'Комментариев на главной: {sum(counts.pop())}')
+    for name, result in results.items():
+        print(
+            f'{name:22} p50 {result["p50"]:8.2f} мс  '
+            f'p95 {result["p95"]:8.2f} мс  '
+            f'запросов {result["queries"]}  '
+            f'память {result["memory"] / 1024:8.1f} КБ'
+        )
+
+
+if __name__ == '__main__':
+    main()
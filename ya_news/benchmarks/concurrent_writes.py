@@ -0,0 +1,156 @@
+"""
+Нагрузочная проверка параллельной записи в SQLite.
+
+Несколько процессов одновременно добавляют комментарии и читают
+главную страницу. Сравниваются стандартный бэкенд SQLite и бэкенд
+проекта yanews.sqlite3 (SQLITE_PRAGMAS и write_atomic с BEGIN IMMEDIATE):
+считаются ошибки «database is locked» и число записей в секунду. Каждый
+режим работает со своей временной базой. Запуск из каталога ya_news:
+
+    python -m benchmarks.concurrent_writes --writers 16 --readers 8
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+ENGINES = ('django.db.backends.sqlite3', 'yanews.sqlite3')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200)
+    return parser.parse_args()
+
+
+def setup_django(db_path, engine):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    from django.conf import settings
+    settings.DATABASES['default'].update(NAME=db_path, ENGINE=engine)
+    django.setup()
+
+
+def create_db(db_path, engine):
+    setup_django(db_path, engine)
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from news.models import News
+    call_command('migrate', verbosity=0)
+    get_user_model().objects.create(username='benchmark')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Просто текст. ' * 50)
+        for index in range(100)
+    )
+
+
+def is_locked(error):
+    return 'locked' in str(error)
+
+
+def writer(db_path, engine, writes, start, results):
+    """
+    Добавляет комментарии в транзакциях, которые сначала читают
+    новость, как это делают формы и обработчики с atomic().
+    """
+    setup_django(db_path, engine)
+    from django.db import OperationalError, transaction
+
+    from news.models import Comment, News
+    from yanews.sqlite3.base import write_atomic
+    atomic = write_atomic if engine == 'yanews.sqlite3' else transaction.atomic
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    start.wait()
+    errors = 0
+    for index in range(writes):
+        try:
+            with atomic():
+                news = News.objects.get(pk=news_ids[index % len(news_ids)])
+                Comment.objects.create(
+                    news=news, author_id=1, text=f'Комментарий {index}'
+                )
+        except OperationalError as error:
+            if not is_locked(error):
+                raise
+            errors += 1
+    results.put(('write', errors))
+
+
+def reader(db_path, engine, start, stop, results):
+    """Повторяет запросы главной страницы, пока идёт запись."""
+    setup_django(db_path, engine)
+    from django.db import OperationalError
+
+    from news.views import NewsList
+    view = NewsList()
+    start.wait()
+    errors = 0
+    while not stop.is_set():
+        try:
+            list(view.get_queryset())
+        except OperationalError as error:
+            if not is_locked(error):
+                raise
+            errors += 1
+    results.put(('read', errors))
+
+
+def run(engine, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'db.sqlite3')
+        process = multiprocessing.Process(
+            target=create_db, args=(db_path, engine)
+        )
+        process.start()
+        process.join()
+        start = multiprocessing.Barrier(args.writers + args.readers + 1)
+        stop = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        writers = [
+            multiprocessing.Process(
+                target=writer,
+                args=(db_path, engine, args.writes, start, results)
+            )
+            for _ in range(args.writers)
+        ]
+        readers = [
+            multiprocessing.Process(
+                target=reader, args=(db_path, engine, start, stop, results)
+            )
+            for _ in range(args.readers)
+        ]
+        for process in writers + readers:
+            process.start()
+        start.wait()
+        began = time.perf_counter()
+        for process in writers:
+            process.join()
+        elapsed = time.perf_counter() - began
+        stop.set()
+        for process in readers:
+            process.join()
+        errors = {'write': 0, 'read': 0}
+        for _ in range(args.writers + args.readers):
+            kind, count = results.get()
+            errors[kind] += count
+    total = args.writers * args.writes
+    print(
+        f'{engine}: {total - errors["write"]} из {total} записей за '
+        f'{elapsed:.1f} с ({(total - errors["write"]) / elapsed:.0f}/с), '
+        f'ошибок блокировки: запись {errors["write"]}, '
+        f'чтение {errors["read"]}'
+    )
+
+
+def main():
+    args = parse_args()
+    for engine in ENGINES:
+        run(engine, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+"""
+Время ответа, число запросов к базе и выделенная память для каждого
+именованного маршрута проекта.
+
+Данные создаются во временной базе, их объём задают --news и
+--comments. Для каждого маршрута печатаются p50/p95/p99 времени ответа,
+число запросов и пик выделенной за запрос памяти (tracemalloc). Если
+у какого-то именованного маршрута нет замера, скрипт сообщает об этом
+и завершается с ошибкой.
+
+С --save результат записывается в файл базовой линии, без него
+сравнивается с сохранённым: больше запросов, чем в базовой линии,
+или медиана времени и память сверх допуска считаются регрессией,
+и скрипт завершается с кодом 1. Хвосты p95/p99 только печатаются:
+на общей машине они слишком шумные для автоматического сравнения.
+Время зависит от машины, поэтому базовая линия не хранится
+в репозитории: её сохраняют на той же машине (или в том же задании CI),
+где идёт сравнение. Запуск из каталога ya_news:
+
+    python -m benchmarks.routes --save
+    python -m benchmarks.routes
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from pathlib import Path
+
+BASELINE = Path(__file__).resolve().parent / 'routes_baseline.json'
+BATCH_SIZE = 5000
+MEMORY_REPEAT = 5
+# Замедление меньше этого не считается регрессией даже сверх допуска.
+MIN_SLOWDOWN_MS = 1
+# Маршруты этих пространств имён не замеряются.
+EXCLUDED_NAMESPACES = ('admin',)
+
+# prepare(client, dataset) вызывается перед каждым запросом вне замера
+# и возвращает аргументы маршрута и данные запроса.
+Route = namedtuple('Route', ('label', 'name', 'method', 'user', 'prepare'))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument(
+        '--comments', type=int, default=50,
+        help='Комментариев к каждой новости.'
+    )
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument(
+        '--save', action='store_true',
+        help='Записать результат как новую базовую линию.'
+    )
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='Допустимый рост p50, доля от базовой линии.'
+    )
+    parser.add_argument(
+        '--memory-tolerance', type=float, default=0.10,
+        help='Допустимый рост памяти, доля от базовой линии.'
+    )
+    parser.add_argument(
+        '--cached', action='store_true',
+        help='Не отключать кеш страниц и фрагментов.'
+    )
+    args = parser.parse_args()
+    if args.repeat < 2:
+        parser.error('--repeat должен быть не меньше 2.')
+    return args
+
+
+def setup_django(db_path, cached):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['testserver']
+    if not cached:
+        settings.PAGE_CACHE_TIMEOUT = 0
+        settings.NEWS_FRAGMENT_CACHE_TIMEOUT = 0
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def create_dataset(news_count, comments_count):
+    """
+    Новости с комментариями автора; возвращает объекты, на которые
+    ссылаются маршруты.
+    """
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News, make_teaser
+    from news.pagination import get_comments_page
+    user_model = get_user_model()
+    author = user_model.objects.create(username='author')
+    reader = user_model.objects.create(username='reader')
+    text = 'Просто текст новости. ' * 50
+    teaser = make_teaser(text)
+    for start in range(0, news_count, BATCH_SIZE):
+        News.objects.bulk_create(
+            News(title=f'Новость {index}', text=text, teaser=teaser)
+            for index in range(start, min(start + BATCH_SIZE, news_count))
+        )
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    comments = (
+        Comment(news_id=pk, author=author, text=f'Комментарий {number}')
+        for pk in news_ids
+        for number in range(comments_count)
+    )
+    while True:
+        batch = [comment for _, comment in zip(range(BATCH_SIZE), comments)]
+        if not batch:
+            break
+        Comment.objects.bulk_create(batch)
+    news = News.objects.get(pk=news_ids[0])
+    _, cursor = get_comments_page(news.pk)
+    return {
+        'users': {'author': author, 'reader': reader},
+        'news': news,
+        'other_news': News.objects.get(pk=news_ids[-1]),
+        'comment': Comment.objects.filter(news=news).first(),
+        'cursor': cursor,
+    }
+
+
+def news_kwargs(client, dataset):
+    return {'pk': dataset['news'].pk}, None
+
+
+def more_comments(client, dataset):
+    """Вторая порция комментариев, если она есть."""
+    cursor = dataset['cursor']
+    return {'pk': dataset['news'].pk}, {'after': cursor} if cursor else {}
+
+
+def new_comment(client, dataset):
+    return {'pk': dataset['other_news'].pk}, {'text': 'Новый комментарий'}
+
+
+def comment_kwargs(client, dataset):
+    return {'pk': dataset['comment'].pk}, None
+
+
+def edit_comment(client, dataset):
+    return {'pk': dataset['comment'].pk}, {'text': 'Исправленный текст'}
+
+
+def comment_to_delete(client, dataset):
+    """Каждый запрос удаляет свежий комментарий."""
+    from news.models import Comment
+    comment = Comment.objects.create(
+        news=dataset['other_news'],
+        author=dataset['users']['author'],
+        text='Удаляемый комментарий',
+    )
+    return {'pk': comment.pk}, None
+
+
+def search(client, dataset):
+    return {}, {'q': 'текст'}
+
+
+def search_with_comments(client, dataset):
+    return {}, {'q': 'комментарий', 'comments': 'on'}
+
+
+def no_args(client, dataset):
+    return {}, None
+
+
+def logged_in(client, dataset):
+    """Выход разлогинивает клиента, поэтому логиним его заново."""
+    client.force_login(dataset['users']['author'])
+    return {}, None
+
+
+ROUTES = (
+    Route('home', 'news:home', 'get', None, no_args),
+    Route('home (author)', 'news:home', 'get', 'author', no_args),
+    Route('detail', 'news:detail', 'get', None, news_kwargs),
+    Route('detail (author)', 'news:detail', 'get', 'author', news_kwargs),
+    Route('comment', 'news:detail', 'post', 'author', new_comment),
+    Route('comments', 'news:comments', 'get', None, more_comments),
+    Route('edit', 'news:edit', 'get', 'author', comment_kwargs),
+    Route('edit (post)', 'news:edit', 'post', 'author', edit_comment),
+    Route('delete', 'news:delete', 'get', 'author', comment_kwargs),
+    Route('delete (post)', 'news:delete', 'post', 'author', comment_to_delete),
+    Route('search', 'news:search', 'get', None, search),
+    Route(
+        'search (comments)', 'news:search', 'get', None, search_with_comments
+    ),
+    Route('login', 'users:login', 'get', None, no_args),
+    Route('logout', 'users:logout', 'post', 'author', logged_in),
+    Route('signup', 'users:signup', 'get', None, no_args),
+)
+
+
+def url_names(resolver=None, prefix=''):
+    """Полные имена всех именованных маршрутов проекта."""
+    from django.urls import URLResolver, get_resolver
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if not isinstance(pattern, URLResolver):
+            if pattern.name:
+                yield prefix + pattern.name
+            continue
+        if pattern.namespace in EXCLUDED_NAMESPACES:
+            continue
+        namespace = f'{pattern.namespace}:' if pattern.namespace else ''
+        yield from url_names(pattern, prefix + namespace)
+
+
+def uncovered_routes(routes=ROUTES):
+    """Именованные маршруты, для которых нет замера."""
+    return sorted(set(url_names()) - {route.name for route in routes})
+
+
+def percentile(values, percent):
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def send(client, route, dataset):
+    from django.urls import reverse
+    kwargs, data = route.prepare(client, dataset)
+    request = getattr(client, route.method)
+    url = reverse(route.name, kwargs=kwargs)
+    return lambda: request(url, data)
+
+
+def make_client(route, dataset):
+    """Клиент с пользователем маршрута; первый запрос прогревает маршрут."""
+    from django.test import Client
+    client = Client()
+    if route.user:
+        client.force_login(dataset['users'][route.user])
+    response = send(client, route, dataset)()
+    if response.status_code >= 400:
+        raise RuntimeError(f'{route.label}: ответ {response.status_code}')
+    return client
+
+
+def measure_memory(client, route, dataset):
+    """Число запросов и медиана пика выделенной за запрос памяти."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    peaks = []
+    for _ in range(MEMORY_REPEAT):
+        request = send(client, route, dataset)
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            try:
+                request()
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+    return len(queries), int(statistics.median(peaks))
+
+
+def measure(routes, dataset, repeat):
+    """
+    Время, число запросов и память для всех маршрутов.
+
+    Маршруты замеряются по очереди в каждом круге, чтобы фоновая
+    нагрузка на машину сказывалась на всех одинаково.
+    """
+    clients = [make_client(route, dataset) for route in routes]
+    timings = [[] for _ in routes]
+    for _ in range(repeat):
+        for route, client, route_timings in zip(routes, clients, timings):
+            request = send(client, route, dataset)
+            start = time.perf_counter()
+            request()
+            route_timings.append(time.perf_counter() - start)
+    results = {}
+    for route, client, route_timings in zip(routes, clients, timings):
+        queries, memory = measure_memory(client, route, dataset)
+        results[route.label] = {
+            'p50': round(percentile(route_timings, 50) * 1000, 3),
+            'p95': round(percentile(route_timings, 95) * 1000, 3),
+            'p99': round(percentile(route_timings, 99) * 1000, 3),
+            'queries': queries,
+            'memory': memory,
+        }
+    return results
+
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """Список регрессий относительно базовой линии."""
+    regressions = []
+    for label, result in results.items():
+        saved = baseline.get(label)
+        if saved is None:
+            continue
+        if result['queries'] > saved['queries']:
+            regressions.append(
+                f'{label}: запросов {result["queries"]} '
+                f'вместо {saved["queries"]}'
+            )
+        slower = result['p50'] - saved['p50']
+        if slower > max(saved['p50'] * tolerance, MIN_SLOWDOWN_MS):
+            regressions.append(
+                f'{label}: p50 {result["p50"]:.2f} мс '
+                f'вместо {saved["p50"]:.2f} мс'
+            )
+        if result['memory'] > saved['memory'] * (1 + memory_tolerance):
+            regressions.append(
+                f'{label}: память {result["memory"] / 1024:.0f} КБ '
+                f'вместо {saved["memory"] / 1024:.0f} КБ'
+            )
+    return regressions
+
+
+def print_results(results, baseline):
+    print(
+        f'{"маршрут":<20}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+        f'{"запросы":>10}{"память, КБ":>12}'
+    )
+    for label, result in results.items():
+        line = (
+            f'{label:<20}{result["p50"]:>10.2f}{result["p95"]:>10.2f}'
+            f'{result["p99"]:>10.2f}{result["queries"]:>10}'
+            f'{result["memory"] / 1024:>12.0f}'
+        )
+        saved = baseline.get(label)
+        if saved is not None:
+            line += (
+                f'   p50 {result["p50"] / saved["p50"] - 1:+.0%}, '
+                f'запросы {result["queries"] - saved["queries"]:+d}'
+            )
+        print(line)
+
+
+def main():
+    args = parse_args()
+    scale = {'news': args.news, 'comments': args.comments}
+    baseline = {}
+    if not args.save:
+        if not args.baseline.exists():
+            sys.exit(
+                f'Нет базовой линии {args.baseline}, '
+                f'сначала запустите с --save.'
+            )
+        saved = json.loads(args.baseline.read_text())
+        if saved['scale'] != scale:
+            sys.exit(
+                f'Базовая линия снята на данных {saved["scale"]}, '
+                f'а не {scale}.'
+            )
+        baseline = saved['routes']
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'db.sqlite3'), args.cached)
+        missing = uncovered_routes()
+        if missing:
+            sys.exit(f'Нет замеров для маршрутов: {", ".join(missing)}')
+        dataset = create_dataset(args.news, args.comments)
+        results = measure(ROUTES, dataset, args.repeat)
+    print_results(results, baseline)
+    if args.save:
+        args.baseline.write_text(json.dumps(
+            {'scale': scale, 'routes': results}, ensure_ascii=False, indent=2
+        ) + '\n')
+        print(f'Базовая линия сохранена в {args.baseline}')
+        return
+    regressions = compare(
+        results, baseline, args.tolerance, args.memory_tolerance
+    )
+    for regression in regressions:
+        print(f'Регрессия: {regression}')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Время поиска по новостям на синтетическом корпусе.
+
+Данные создаются во временной базе. Запуск из каталога ya_news:
+
+    python -m benchmarks.search --news 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from itertools import accumulate
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+VOCABULARY_SIZE = 20_000
+BATCH_SIZE = 5000
+REPEAT = 20
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=1_000_000)
+    return parser.parse_args()
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    from django.conf import settings
+    django.setup()
+    settings.DATABASES['default']['NAME'] = db_path
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_vocabulary(rng):
+    """
+    Словарь и накопленные веса слов по закону Ципфа, как в обычных текстах.
+    """
+    words = [
+        ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+    weights = list(accumulate(
+        1 / rank for rank in range(1, VOCABULARY_SIZE + 1)
+    ))
+    return words, weights
+
+
+def create_corpus(count, rng, words, weights):
+    from news.models import News
+    for start in range(0, count, BATCH_SIZE):
+        News.objects.bulk_create(
+            News(
+                title=' '.join(rng.choices(words, cum_weights=weights, k=4)),
+                text=' '.join(rng.choices(words, cum_weights=weights, k=60)),
+            )
+            for _ in range(start, min(start + BATCH_SIZE, count))
+        )
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'db.sqlite3'))
+        from news.search import search_news
+        rng = random.Random(0)
+        words, weights = make_vocabulary(rng)
+        started = time.perf_counter()
+        create_corpus(args.news, rng, words, weights)
+        print(
+            f'Создано {args.news} новостей за '
+            f'{time.perf_counter() - started:.1f} с'
+        )
+        queries = (
+            (words[100], 1), (words[100], 5), (words[5000], 1),
+            (f'{words[200]} {words[300]}', 1), (words[10][:3], 1),
+        )
+        for query, page in queries:
+            timings = []
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                found, _ = search_news(query, page=page)
+                timings.append(time.perf_counter() - started)
+            print(
+                f'«{query}», страница {page}: найдено {len(found)}, '
+                f'медиана {statistics.median(timings) * 1000:.2f} мс'
+            )
+
+
+if __name__ == '__main__':
+    main()
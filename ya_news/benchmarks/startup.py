@@ -0,0 +1,123 @@
+"""
+Время старта воркера, первого запроса и установившееся время ответа
+в трёх режимах: настройки разработки, боевые настройки без прогрева
+и боевые настройки с прогревом шаблонов и URLconf.
+
+Каждый режим запускается в отдельном процессе, чтобы первый запрос
+действительно был первым. Запуск из каталога ya_news:
+
+    python -m benchmarks.startup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from wsgiref.util import setup_testing_defaults
+
+MODES = {
+    'dev': ('yanews.settings', False),
+    'production': ('yanews.settings_production', False),
+    'production+warm_up': ('yanews.settings_production', True),
+}
+URLS = ('/', '/news/1/', '/auth/login/', '/search/?q=news')
+REPEAT = 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def create_db(db_path):
+    """Временная база с новостями и комментариями для всех режимов."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    django.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from news.models import Comment, News
+    call_command('migrate', verbosity=0)
+    author = get_user_model().objects.create(username='benchmark')
+    for index in range(settings.NEWS_COUNT_ON_HOME_PAGE):
+        news = News.objects.create(
+            title=f'Новость {index}', text='Просто текст. ' * 50
+        )
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text=f'Комментарий {number}')
+            for number in range(20)
+        )
+
+
+def call_wsgi(application, url):
+    """Выполняет GET-запрос к приложению WSGI, как это делает сервер."""
+    path, _, query = url.partition('?')
+    environ = {'PATH_INFO': path, 'QUERY_STRING': query}
+    setup_testing_defaults(environ)
+    response = application(environ, lambda status, headers: None)
+    b''.join(response)
+    response.close()
+
+
+def measure(mode, db_path):
+    """Замеры в отдельном процессе; результат печатается в JSON."""
+    settings_module, warm_up = MODES[mode]
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['127.0.0.1']
+    settings.PAGE_CACHE_TIMEOUT = 0
+    settings.NEWS_FRAGMENT_CACHE_TIMEOUT = 0
+    settings.WARM_UP_ON_START = warm_up
+    start = time.perf_counter()
+    from yanews.wsgi import application
+    startup = time.perf_counter() - start
+    result = {'startup': startup, 'first': {}, 'steady': {}}
+    for url in URLS:
+        start = time.perf_counter()
+        call_wsgi(application, url)
+        result['first'][url] = time.perf_counter() - start
+    for url in URLS:
+        timings = []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            call_wsgi(application, url)
+            timings.append(time.perf_counter() - start)
+        result['steady'][url] = statistics.median(timings)
+    print(json.dumps(result))
+
+
+def main():
+    args = parse_args()
+    if args.mode:
+        measure(args.mode, args.db)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'db.sqlite3')
+        create_db(db_path)
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.startup',
+                 '--mode', mode, '--db', db_path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output)
+            print(f'{mode}: старт {result["startup"] * 1000:.0f} мс')
+            for url in URLS:
+                print(
+                    f'    {url}: первый запрос '
+                    f'{result["first"][url] * 1000:.1f} мс, '
+                    f'далее {result["steady"][url] * 1000:.2f} мс'
+                )
+
+
+if __name__ == '__main__':
+    main()
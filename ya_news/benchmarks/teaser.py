@@ -0,0 +1,129 @@
+"""
+Время вывода новостей на главной: truncatewords по полному тексту
+и сохранённый анонс, для новостей разной длины.
+
+Данные создаются во временной базе. Запуск из каталога ya_news:
+
+    python -m benchmarks.teaser --sizes 10240 102400 1048576
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+REPEAT = 20
+# Блок новости из news/home.html до и после перехода на анонс.
+RUNTIME_TEMPLATE = (
+    '{% for news in object_list %}'
+    '<h3>{{ news.title }}</h3><small>{{ news.date }}</small>'
+    '<div>{{ news.text|truncatewords:15 }}</div>'
+    '{% endfor %}'
+)
+STORED_TEMPLATE = (
+    '{% for news in object_list %}'
+    '<h3>{{ news.title }}</h3><small>{{ news.date }}</small>'
+    '<div>{{ news.teaser }}</div>'
+    '{% endfor %}'
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10_240, 102_400, 1_048_576],
+        help='Размеры текста новости в символах.'
+    )
+    return parser.parse_args()
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    import django
+    from django.conf import settings
+    django.setup()
+    settings.DATABASES['default']['NAME'] = db_path
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_text(rng, size):
+    words = []
+    length = 0
+    while length < size:
+        word = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(2, 9)))
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def create_news(rng, size):
+    """Заполняет главную страницу новостями заданной длины."""
+    from django.conf import settings
+
+    from news.models import News, make_teaser
+    News.objects.all().delete()
+    texts = [
+        make_text(rng, size) for _ in range(settings.NEWS_COUNT_ON_HOME_PAGE)
+    ]
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text=text, teaser=make_teaser(text))
+        for index, text in enumerate(texts)
+    )
+    return texts
+
+
+def median_ms(func):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'db.sqlite3'))
+        from django.conf import settings
+        from django.template import Context, Template
+        from django.utils.text import Truncator
+
+        from news.models import LIST_FIELDS, TEASER_WORDS, News, make_teaser
+        page_size = settings.NEWS_COUNT_ON_HOME_PAGE
+        runtime_template = Template(RUNTIME_TEMPLATE)
+        stored_template = Template(STORED_TEMPLATE)
+
+        def render_runtime():
+            news_list = list(News.objects.all()[:page_size])
+            runtime_template.render(Context({'object_list': news_list}))
+
+        def render_stored():
+            news_list = list(News.objects.only(*LIST_FIELDS)[:page_size])
+            stored_template.render(Context({'object_list': news_list}))
+
+        rng = random.Random(0)
+        for size in args.sizes:
+            texts = create_news(rng, size)
+            runtime = median_ms(render_runtime)
+            stored = median_ms(render_stored)
+            print(
+                f'{size // 1024} КБ: truncatewords {runtime:.2f} мс, '
+                f'анонс {stored:.2f} мс, ускорение {runtime / stored:.0f}x'
+            )
+            truncator = median_ms(
+                lambda: [Truncator(text).words(TEASER_WORDS)
+                         for text in texts]
+            )
+            teaser = median_ms(lambda: [make_teaser(text) for text in texts])
+            print(
+                f'    расчёт анонса при сохранении: Truncator '
+                f'{truncator:.2f} мс, make_teaser {teaser:.3f} мс'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import hashlib
+import time
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+NEWS_VERSION_KEY = 'news_version:{pk}'
+PAGE_KEY = 'page:{path}'
+
+
+def get_news_versions(news_ids):
+    """
+    Возвращает версии кеша для новостей.
+
+    Если версия новости ещё не сохранена (или была вытеснена из кеша),
+    для неё создаётся новая, чтобы не отдать устаревший фрагмент.
+    """
+    keys = {pk: NEWS_VERSION_KEY.format(pk=pk) for pk in news_ids}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    missing = {}
+    for pk, key in keys.items():
+        if key in stored:
+            versions[pk] = stored[key]
+        else:
+            versions[pk] = missing[key] = time.time_ns()
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+def bump_news_versions(news_ids):
+    """Делает устаревшими все закешированные фрагменты новостей."""
+    version = time.time_ns()
+    cache.set_many(
+        {NEWS_VERSION_KEY.format(pk=pk): version for pk in news_ids}, None
+    )
+
+
+def invalidate_news_cache(*news_ids):
+    """
+    Сбрасывает кеш, зависящий от новостей и комментариев к ним: блоки
+    новостей на главной странице и закешированные целиком главную
+    и страницы новостей. Для любого числа новостей — две операции с кешем.
+    """
+    bump_news_versions(news_ids)
+    cache.delete_many([
+        PAGE_KEY.format(path=reverse('news:home')),
+        *(
+            PAGE_KEY.format(path=reverse('news:detail', args=(pk,)))
+            for pk in news_ids
+        ),
+    ])
+
+
+def conditional_response(request, entry):
+    """Ответ из кеша либо 304, если у клиента актуальная версия."""
+    response = get_conditional_response(
+        request,
+        etag=entry['etag'],
+        last_modified=entry['last_modified'],
+    )
+    if response is None:
+        response = HttpResponse(
+            entry['content'],
+            content_type=entry['content_type']
+        )
+    response['ETag'] = entry['etag']
+    if entry['last_modified'] is not None:
+        response['Last-Modified'] = http_date(entry['last_modified'])
+    return response
+
+
+def is_cacheable_request(request):
+    """Кешируем только чтение страниц анонимными пользователями."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def get_cached_page(request):
+    return cache.get(PAGE_KEY.format(path=request.path))
+
+
+def cache_page_response(request, response):
+    """
+    Сохраняет отрендеренную страницу в кеш.
+
+    Возвращает исходный ответ с ETag либо 304, если у клиента
+    уже есть эта версия страницы.
+    """
+    if response.status_code != HTTPStatus.OK:
+        return response
+    if hasattr(response, 'render'):
+        response.render()
+    entry = {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+        'last_modified': parse_http_date_safe(
+            response.get('Last-Modified', '')
+        ),
+    }
+    cache.set(
+        PAGE_KEY.format(path=request.path),
+        entry,
+        settings.PAGE_CACHE_TIMEOUT
+    )
+    conditional = conditional_response(request, entry)
+    if conditional.status_code == HTTPStatus.NOT_MODIFIED:
+        return conditional
+    response['ETag'] = entry['etag']
+    return response
+
+
+def cache_anonymous_page(view_func):
+    """
+    Кеширует страницу целиком для анонимных пользователей.
+
+    ETag вычисляется по содержимому страницы, Last-Modified выставляет
+    сама view. На условные запросы с актуальной версией отвечаем 304.
+    Авторизованные пользователи всегда получают свежую страницу.
+    """
+    @wraps(view_func)
+    def inner(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+        entry = get_cached_page(request)
+        if entry is not None:
+            return conditional_response(request, entry)
+        return cache_page_response(
+            request, view_func(request, *args, **kwargs)
+        )
+    return inner
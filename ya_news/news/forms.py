@@ -1,7 +1,11 @@
+from functools import lru_cache
+
+from django.conf import settings
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
 from .models import Comment
+from .moderation import compile_words_pattern, read_words_file
 
 BAD_WORDS = (
     'редиска',
@@ -11,6 +15,21 @@ BAD_WORDS = (
 WARNING = 'Не ругайтесь!'
 
 
+@lru_cache(maxsize=None)
+def get_bad_words_pattern():
+    """
+    Регулярное выражение для поиска запрещённых слов.
+
+    Список берётся из настройки BAD_WORDS (по умолчанию — из этого модуля)
+    и дополняется словами из файла BAD_WORDS_FILE, если он указан.
+    Выражение компилируется один раз при первом обращении.
+    """
+    words = list(getattr(settings, 'BAD_WORDS', BAD_WORDS))
+    if settings.BAD_WORDS_FILE:
+        words += read_words_file(settings.BAD_WORDS_FILE)
+    return compile_words_pattern(words)
+
+
 class CommentForm(ModelForm):
 
     class Meta:
@@ -20,8 +39,7 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        pattern = get_bad_words_pattern()
+        if pattern is not None and pattern.search(text.lower()):
+            raise ValidationError(WARNING)
         return text
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+from news.models import Comment, News
+from news.transfer import (
+    COMMENT_VALUES, FORMATS, NEWS_VALUES, comment_to_record, news_to_record,
+    write_records
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает новости и комментарии в файл JSONL или CSV. '
+        'Записи читаются из базы порциями, память не растёт с объёмом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл для выгрузки.')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла, по умолчанию — по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Сколько записей читать из базы за один запрос.'
+        )
+
+    def handle(self, *args, path, batch_size, **options):
+        file_format = options['format'] or path.rsplit('.', 1)[-1]
+        if file_format not in FORMATS:
+            file_format = 'jsonl'
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            written = write_records(
+                file, self.records(batch_size), file_format
+            )
+            count = 0
+            for count, _ in enumerate(written, 1):
+                if count % batch_size == 0:
+                    self.stdout.write(f'Выгружено записей: {count}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Готово, выгружено записей: {count}')
+        )
+
+    def records(self, batch_size):
+        news = News.objects.order_by('pk').values(*NEWS_VALUES)
+        for values in news.iterator(chunk_size=batch_size):
+            yield news_to_record(values)
+        comments = Comment.objects.order_by('pk').values(*COMMENT_VALUES)
+        for values in comments.iterator(chunk_size=batch_size):
+            yield comment_to_record(values)
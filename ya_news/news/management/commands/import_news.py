@@ -0,0 +1,141 @@
+import json
+import os
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection
+
+from news.cache import invalidate_news_cache
+from news.models import Comment, News
+from news.transfer import (
+    COMMENT, FORMATS, NEWS, get_author_ids, read_header,
+    read_records, record_to_comment, record_to_news
+)
+from yanews.sqlite3.base import write_atomic
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости и комментарии из файла JSONL или CSV '
+        'порциями через bulk_create. Прерванную загрузку можно '
+        'продолжить с сохранённой контрольной точки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с выгрузкой.')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла, по умолчанию — по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько записей сохранять в одной транзакции.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки, по умолчанию <path>.checkpoint.'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать загрузку заново, не учитывая контрольную точку.'
+        )
+
+    def handle(self, *args, path, batch_size, **options):
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден.')
+        file_format = options['format'] or path.rsplit('.', 1)[-1]
+        if file_format not in FORMATS:
+            file_format = 'jsonl'
+        checkpoint = Path(options['checkpoint'] or f'{path}.checkpoint')
+        state = {'offset': 0, 'done': 0}
+        if checkpoint.exists() and not options['restart']:
+            state = json.loads(checkpoint.read_text())
+            self.stdout.write(f'Продолжаем с записи {state["done"]}')
+        started = time.monotonic()
+        imported = 0
+        # Файл читается в двоичном режиме: tell() даёт смещение после
+        # последней прочитанной строки, и продолжение загрузки не
+        # разбирает уже загруженные записи заново.
+        with open(path, 'rb') as file:
+            file.seek(state['offset'])
+            lines = (line.decode('utf-8') for line in file)
+            if file_format == 'csv' and 'header' not in state:
+                state['header'] = read_header(lines)
+            records = read_records(lines, file_format, state.get('header'))
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                # Кеш сбрасывается до записи контрольной точки: если
+                # загрузку прервут между ними, порция загрузится снова.
+                invalidate_news_cache(*self.import_batch(batch))
+                state['offset'] = file.tell()
+                state['done'] += len(batch)
+                imported += len(batch)
+                self.save_checkpoint(checkpoint, state)
+                rate = imported / (time.monotonic() - started)
+                self.stdout.write(
+                    f'Загружено записей: {state["done"]} '
+                    f'({rate:.0f} в секунду)'
+                )
+        self.reset_sequences()
+        checkpoint.unlink(missing_ok=True)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Готово, загружено записей: {state["done"]}'
+            )
+        )
+
+    def import_batch(self, batch):
+        """
+        Сохраняет порцию записей одной транзакцией и возвращает id
+        затронутых новостей.
+        """
+        news = [
+            record_to_news(record)
+            for record in batch if record['model'] == NEWS
+        ]
+        comment_records = [
+            record for record in batch if record['model'] == COMMENT
+        ]
+        with write_atomic():
+            News.objects.bulk_create(news, ignore_conflicts=True)
+            if comment_records:
+                author_ids = get_author_ids(
+                    record['author'] for record in comment_records
+                )
+                Comment.objects.bulk_create(
+                    (
+                        record_to_comment(record, author_ids)
+                        for record in comment_records
+                    ),
+                    ignore_conflicts=True,
+                )
+        return {news_item.pk for news_item in news} | {
+            int(record['news_id']) for record in comment_records
+        }
+
+    def save_checkpoint(self, checkpoint, state):
+        """
+        Контрольная точка — смещение в файле, число загруженных записей
+        и заголовок CSV. Записывается атомарно через замену файла.
+        """
+        temporary = checkpoint.with_name(checkpoint.name + '.tmp')
+        temporary.write_text(json.dumps(state, ensure_ascii=False))
+        os.replace(temporary, checkpoint)
+
+    def reset_sequences(self):
+        """После загрузки с явными pk обновляем счётчики первичных ключей."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [News, Comment]
+        )
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,61 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:31
+
+import re
+from importlib import import_module
+from itertools import islice
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+TEASER_WORDS = 15
+WORD_RE = re.compile(r'\S+')
+TRUNCATION = ' …'
+# SQLite добавляет поле, пересоздавая таблицу, и теряет триггеры
+# полнотекстового индекса: индекс удаляется и строится заново.
+news_fts = import_module('news.migrations.0003_news_fts')
+
+
+def make_teaser(text):
+    """
+    Копия news.models.make_teaser на момент миграции: миграция не должна
+    зависеть от того, как анонс строится в текущей версии модели.
+    """
+    words = [
+        match.group()
+        for match in islice(WORD_RE.finditer(text), TEASER_WORDS + 1)
+    ]
+    if len(words) > TEASER_WORDS:
+        return ' '.join(words[:TEASER_WORDS]) + TRUNCATION
+    return ' '.join(words)
+
+
+def fill_teasers(apps, schema_editor):
+    """Анонсы существующих новостей, порциями по BATCH_SIZE."""
+    News = apps.get_model('news', 'News')
+    batch = []
+    news_list = News.objects.only('text').order_by('pk')
+    for news in news_list.iterator(chunk_size=BATCH_SIZE):
+        news.teaser = make_teaser(news.text)
+        batch.append(news)
+        if len(batch) == BATCH_SIZE:
+            News.objects.bulk_update(batch, ('teaser',))
+            batch = []
+    News.objects.bulk_update(batch, ('teaser',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_news_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(news_fts.drop_fts, news_fts.create_fts),
+        migrations.AddField(
+            model_name='news',
+            name='teaser',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_teasers, migrations.RunPython.noop),
+        migrations.RunPython(news_fts.create_fts, news_fts.drop_fts),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:25
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    """
+    auto_now_add заменяется значением по умолчанию. В базе столбец
+    не меняется, поэтому изменение вносится только в состояние миграций:
+    SQLite иначе пересоздал бы таблицу и потерял бы триггеры
+    полнотекстового индекса из 0003_news_fts.
+    """
+
+    dependencies = [
+        ('news', '0004_news_teaser'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='comment',
+                    name='created',
+                    field=models.DateTimeField(
+                        default=django.utils.timezone.now, editable=False
+                    ),
+                ),
+            ],
+        ),
+    ]
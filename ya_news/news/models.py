@@ -1,22 +1,60 @@
+import re
 from datetime import datetime
+from itertools import islice
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+TEASER_WORDS = 15
+WORD_RE = re.compile(r'\S+')
+# Окончание обрезанного текста, как у фильтра truncatewords.
+TRUNCATION = ' …'
+# Поля новости, которые выводятся в списках.
+LIST_FIELDS = ('title', 'date', 'teaser')
+
+
+def make_teaser(text):
+    """
+    Анонс новости: первые TEASER_WORDS слов текста, как truncatewords.
+
+    В отличие от truncatewords текст разбирается только до первого слова
+    после анонса, поэтому время не зависит от длины новости.
+    """
+    words = [
+        match.group()
+        for match in islice(WORD_RE.finditer(text), TEASER_WORDS + 1)
+    ]
+    if len(words) > TEASER_WORDS:
+        return ' '.join(words[:TEASER_WORDS]) + TRUNCATION
+    return ' '.join(words)
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    teaser = models.TextField(blank=True, editable=False)
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', 'id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """Анонс пересчитывается из текста при каждом сохранении."""
+        self.teaser = make_teaser(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'teaser'}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -28,10 +66,22 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
     )
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    # Не auto_now_add: импорт и генератор данных передают время создания
+    # явно, а bulk_create перезаписал бы его текущим.
+    created = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'),
+                name='comment_news_created_idx'
+            ),
+            models.Index(
+                fields=('author', 'created'),
+                name='comment_author_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
@@ -0,0 +1,62 @@
+import re
+
+WORD_END = ''
+
+
+def build_trie(words):
+    """Префиксное дерево слов: вложенные словари по символам."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[WORD_END] = {}
+    return trie
+
+
+def trie_to_regex(node):
+    """
+    Строит регулярное выражение по префиксному дереву.
+
+    Для поиска вхождения достаточно найти самое короткое слово,
+    поэтому продолжения уже найденного слова отбрасываются.
+    """
+    if WORD_END in node:
+        return ''
+    single_chars = []
+    alternatives = []
+    for char in sorted(node):
+        tail = trie_to_regex(node[char])
+        if tail:
+            alternatives.append(re.escape(char) + tail)
+        else:
+            single_chars.append(re.escape(char))
+    if len(single_chars) == 1:
+        alternatives.append(single_chars[0])
+    elif single_chars:
+        alternatives.append('[' + ''.join(single_chars) + ']')
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')'
+
+
+def compile_words_pattern(words):
+    """
+    Компилирует список слов в одно регулярное выражение.
+
+    Общие префиксы слов объединяются, поэтому проверка текста
+    не перебирает слова по одному. Для пустого списка возвращает None.
+    """
+    words = {word.strip().lower() for word in words} - {''}
+    if not words:
+        return None
+    return re.compile(trie_to_regex(build_trie(words)))
+
+
+def read_words_file(path):
+    """Читает слова из файла: по одному на строке, # — комментарий."""
+    with open(path, encoding='utf-8') as file:
+        return [
+            line.strip() for line in file
+            if line.strip() and not line.startswith('#')
+        ]
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+
+from .models import Comment
+
+CURSOR_SEPARATOR = '_'
+
+
+def encode_cursor(comment):
+    """Курсор указывает на последний показанный комментарий."""
+    return f'{comment.created.isoformat()}{CURSOR_SEPARATOR}{comment.pk}'
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор на дату создания и pk комментария."""
+    try:
+        created, pk = cursor.rsplit(CURSOR_SEPARATOR, 1)
+        return datetime.fromisoformat(created), int(pk)
+    except ValueError:
+        raise BadRequest('Некорректный курсор.')
+
+
+def get_comments_page(news_id, cursor=None):
+    """
+    Возвращает порцию комментариев к новости и курсор следующей порции.
+
+    Комментарии выбираются по ключу (created, pk) после курсора, поэтому
+    стоимость запроса не зависит от того, насколько далеко листает
+    пользователь. Если комментариев больше нет, курсор равен None.
+    """
+    page_size = settings.COMMENTS_COUNT_ON_PAGE
+    comments = Comment.objects.filter(
+        news_id=news_id
+    ).select_related('author').order_by('created', 'pk')
+    if cursor:
+        created, pk = decode_cursor(cursor)
+        comments = comments.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    comments = list(comments[:page_size + 1])
+    next_cursor = None
+    if len(comments) > page_size:
+        comments = comments[:page_size]
+        next_cursor = encode_cursor(comments[-1])
+    return comments, next_cursor
@@ -0,0 +1,71 @@
+"""
+Плагин pytest с синтетическими данными из news.synthetic.
+
+Фикстура synthetic_db заполняет тестовую базу пользователями,
+новостями и комментариями, объём задаёт маркер synthetic:
+
+    @pytest.mark.synthetic(news=10_000, comments=100_000)
+    def test_home(client, synthetic_db):
+        ...
+
+Сгенерированная база сохраняется снимком в каталоге --synthetic-cache
+и в следующих запусках восстанавливается из него за доли секунды.
+После теста база возвращается к состоянию сразу после миграций.
+Подключается в pytest.ini опцией -p news.pytest_plugin.
+"""
+import os
+import sqlite3
+
+import pytest
+
+DEFAULTS = {'users': 100, 'news': 1000, 'comments': 10_000, 'seed': 0}
+CACHE_DIR = '.synthetic_cache'
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--synthetic-cache',
+        help=f'Каталог снимков синтетических данных, по умолчанию '
+             f'{CACHE_DIR} в корне проекта.'
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'synthetic(users, news, comments, seed): объём данных '
+        'для фикстуры synthetic_db.'
+    )
+
+
+@pytest.fixture(scope='session')
+def migrated_db_snapshot(django_db_setup, django_db_blocker):
+    """Копия пустой тестовой базы в памяти."""
+    from news.synthetic import raw_connection
+    snapshot = sqlite3.connect(':memory:')
+    with django_db_blocker.unblock():
+        raw_connection().backup(snapshot)
+    yield snapshot
+    snapshot.close()
+
+
+@pytest.fixture
+def synthetic_db(request, transactional_db, migrated_db_snapshot):
+    """Тестовая база с синтетическими данными; возвращает их параметры."""
+    from news.synthetic import (
+        generate, load_snapshot, raw_connection, save_snapshot, snapshot_name
+    )
+    marker = request.node.get_closest_marker('synthetic')
+    params = {**DEFAULTS, **(marker.kwargs if marker else {})}
+    cache_dir = (
+        request.config.getoption('synthetic_cache')
+        or request.config.rootpath / CACHE_DIR
+    )
+    path = os.path.join(cache_dir, snapshot_name(**params))
+    if os.path.exists(path):
+        load_snapshot(path)
+    else:
+        generate(**params)
+        save_snapshot(path)
+    yield params
+    migrated_db_snapshot.backup(raw_connection())
@@ -2,11 +2,19 @@ from datetime import datetime, timedelta
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 
-from news.models import Comment, News
+from news.models import Comment, News, make_teaser
 
 COMMENT_TEXT = 'Текст комментария'
+NEWS_LIST_SIZE = settings.NEWS_COUNT_ON_HOME_PAGE + 1
+COMMENTS_LIST_SIZE = 2
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
 
 
 @pytest.fixture
@@ -50,30 +58,65 @@ def pk_for_args_comment(comment):
 
 
 @pytest.fixture
-def news_list():
-    today = datetime.today()
-    all_news = []
-    for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1):
-        news = News(
-            title=f'Новость {index}',
-            text='Просто текст.',
-            date=today - timedelta(days=index)
+def make_news_list():
+    """
+    Фабрика новостей: size новостей одним bulk_create, даты убывают
+    по дню от сегодняшней.
+    """
+    def make_news_list(size=NEWS_LIST_SIZE):
+        today = datetime.today()
+        text = 'Просто текст.'
+        # bulk_create не вызывает save(), анонс считается заранее.
+        teaser = make_teaser(text)
+        return News.objects.bulk_create(
+            News(
+                title=f'Новость {index}',
+                text=text,
+                teaser=teaser,
+                date=today - timedelta(days=index),
+            )
+            for index in range(size)
         )
-        all_news.append(news)
-        News.objects.bulk_create(all_news)
+    return make_news_list
 
 
 @pytest.fixture
-def comments_list(news, author):
-    now = timezone.now()
-    for index in range(2):
-        comment = Comment.objects.create(
-            news=news,
-            author=author,
-            text=f'Tекст {index}',
+def make_comments_list():
+    """
+    Фабрика комментариев: size комментариев автора к новости одним
+    bulk_create, время создания растёт по дню от текущего.
+    """
+    def make_comments_list(news, author, size=COMMENTS_LIST_SIZE):
+        now = timezone.now()
+        return Comment.objects.bulk_create(
+            Comment(
+                news=news,
+                author=author,
+                text=f'Tекст {index}',
+                created=now + timedelta(days=index),
+            )
+            for index in range(size)
         )
-        comment.created = now + timedelta(days=index)
-        comment.save()
+    return make_comments_list
+
+
+@pytest.fixture
+def news_list(request, make_news_list):
+    """
+    Новости для главной страницы. Число новостей меняется косвенной
+    параметризацией:
+
+        @pytest.mark.parametrize('news_list', (10_000,), indirect=True)
+    """
+    return make_news_list(getattr(request, 'param', NEWS_LIST_SIZE))
+
+
+@pytest.fixture
+def comments_list(request, make_comments_list, news, author):
+    """Комментарии к новости; число задаётся так же, как у news_list."""
+    return make_comments_list(
+        news, author, getattr(request, 'param', COMMENTS_LIST_SIZE)
+    )
 
 
 @pytest.fixture
@@ -0,0 +1,44 @@
+import pytest
+
+from benchmarks.routes import (
+    ROUTES, compare, create_dataset, measure, uncovered_routes
+)
+
+BASELINE = {'home': {'p50': 10, 'queries': 2, 'memory': 1000}}
+
+
+def test_benchmark_covers_all_routes():
+    """Для каждого именованного маршрута есть замер."""
+    assert uncovered_routes() == []
+
+
+@pytest.mark.parametrize(
+    'result, regressions',
+    (
+        ({'p50': 12, 'queries': 2, 'memory': 1050}, 0),
+        ({'p50': 10, 'queries': 1, 'memory': 500}, 0),
+        ({'p50': 10, 'queries': 3, 'memory': 1000}, 1),
+        ({'p50': 13, 'queries': 2, 'memory': 1000}, 1),
+        ({'p50': 10, 'queries': 2, 'memory': 1200}, 1),
+    ),
+)
+def test_compare(result, regressions):
+    """Регрессия — рост запросов, времени или памяти сверх допуска."""
+    assert len(compare({'home': result}, BASELINE, 0.25, 0.1)) == regressions
+
+
+def test_compare_ignores_small_slowdown():
+    """Замедление меньше миллисекунды не считается регрессией."""
+    baseline = {'home': {'p50': 1, 'queries': 1, 'memory': 1000}}
+    result = {'p50': 1.5, 'queries': 1, 'memory': 1000}
+    assert compare({'home': result}, baseline, 0.25, 0.1) == []
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_measure_all_routes(settings):
+    """Все маршруты отвечают без ошибок на синтетических данных."""
+    settings.PAGE_CACHE_TIMEOUT = 0
+    results = measure(ROUTES, create_dataset(3, 25), repeat=2)
+    assert set(results) == {route.label for route in ROUTES}
+    assert results['home']['queries'] > 0
@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from news.management.commands.import_news import Command
+from news.models import Comment, News
+from news.transfer import read_records
+
+NEWS_FIELDS = ('pk', 'title', 'text', 'date')
+COMMENT_FIELDS = ('pk', 'news_id', 'author__username', 'text', 'created')
+
+
+def dump_db():
+    return (
+        list(News.objects.order_by('pk').values_list(*NEWS_FIELDS)),
+        list(Comment.objects.order_by('pk').values_list(*COMMENT_FIELDS)),
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('news_list', 'comments_list')
+@pytest.mark.parametrize('file_format', ('jsonl', 'csv'))
+def test_export_import_roundtrip(tmp_path, file_format):
+    """Выгруженные новости и комментарии загружаются без изменений."""
+    path = str(tmp_path / f'news.{file_format}')
+    expected = dump_db()
+    call_command('export_news', path, batch_size=3)
+    News.objects.all().delete()
+    call_command('import_news', path, batch_size=4)
+    assert dump_db() == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('news_list', 'comments_list')
+@pytest.mark.parametrize('file_format', ('jsonl', 'csv'))
+def test_import_resumes_from_checkpoint(tmp_path, file_format):
+    """
+    Прерванная загрузка продолжается с контрольной точки: загруженные
+    записи не читаются заново, файл точки удаляется.
+    """
+    path = str(tmp_path / f'news.{file_format}')
+    checkpoint = Path(f'{path}.checkpoint')
+    call_command('export_news', path)
+    with open(path, encoding='utf-8', newline='') as file:
+        records = list(read_records(file, file_format))
+    expected = dump_db()
+    News.objects.all().delete()
+    import_batch = Command.import_batch
+    batches = []
+
+    def interrupted(command, batch):
+        if len(batches) == 2:
+            raise KeyboardInterrupt
+        batches.append(batch)
+        return import_batch(command, batch)
+
+    with mock.patch.object(Command, 'import_batch', interrupted):
+        with pytest.raises(KeyboardInterrupt):
+            call_command('import_news', path, batch_size=2)
+    assert json.loads(checkpoint.read_text())['done'] == 4
+    with mock.patch.object(
+        Command, 'import_batch', autospec=True, side_effect=import_batch
+    ) as resumed:
+        call_command('import_news', path, batch_size=2)
+    batches += [call.args[1] for call in resumed.call_args_list]
+    assert [record for batch in batches for record in batch] == records
+    assert dump_db() == expected
+    assert not checkpoint.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('news_list', 'comments_list')
+def test_import_invalidates_cache_per_batch(tmp_path):
+    """Кеш новостей сбрасывается после каждой порции, только для неё."""
+    path = str(tmp_path / 'news.jsonl')
+    call_command('export_news', path)
+    news_ids = set(News.objects.values_list('pk', flat=True))
+    News.objects.all().delete()
+    with mock.patch(
+        'news.management.commands.import_news.invalidate_news_cache'
+    ) as invalidate:
+        call_command('import_news', path, batch_size=2)
+    with open(path, encoding='utf-8') as file:
+        batches = -(-sum(1 for _ in file) // 2)
+    assert invalidate.call_count == batches
+    for call in invalidate.call_args_list:
+        assert len(set(call.args)) <= 2
+    assert set().union(
+        *(call.args for call in invalidate.call_args_list)
+    ) == news_ids
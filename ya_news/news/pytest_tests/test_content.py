@@ -1,15 +1,38 @@
+from http import HTTPStatus
+from unittest import mock
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from news.cache import invalidate_news_cache
 from news.forms import CommentForm
+from news.models import TEASER_WORDS, Comment, News, make_teaser
+from news.search import search_news
+from news.views import (
+    NewsDetailView, NewsList, news_detail_async, news_list_async
+)
 
 
 HOME_URL = 'news:home'
+# Размер списков для проверок на объёме, близком к рабочему.
+LARGE_LIST_SIZE = 10_000
 
 
 @pytest.mark.django_db
 @pytest.mark.usefixtures('news_list')
+@pytest.mark.parametrize(
+    'news_list',
+    (settings.NEWS_COUNT_ON_HOME_PAGE + 1, LARGE_LIST_SIZE),
+    indirect=True
+)
 def test_news_count(author_client):
     """Количество новостей на главной странице — не более 10."""
     url = reverse(HOME_URL)
@@ -21,6 +44,11 @@ def test_news_count(author_client):
 
 @pytest.mark.django_db
 @pytest.mark.usefixtures('news_list')
+@pytest.mark.parametrize(
+    'news_list',
+    (settings.NEWS_COUNT_ON_HOME_PAGE + 1, LARGE_LIST_SIZE),
+    indirect=True
+)
 def test_news_order(author_client):
     """
     Новости отсортированы от самой свежей к самой старой.
@@ -34,8 +62,76 @@ def test_news_order(author_client):
     assert all_dates == sorted_dates
 
 
+@pytest.mark.django_db
+def test_home_page_comment_count(client, news, author):
+    """
+    Количество комментариев на главной странице подсчитывается в запросе,
+    число запросов не зависит от количества комментариев.
+    """
+    url = reverse(HOME_URL)
+    Comment.objects.create(news=news, author=author, text='Текст')
+    with CaptureQueriesContext(connection) as few_comments:
+        client.get(url)
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(100)
+    )
+    invalidate_news_cache(news.pk)
+    with CaptureQueriesContext(connection) as many_comments:
+        response = client.get(url)
+    assert len(many_comments) == len(few_comments)
+    news_on_page = response.context['object_list']
+    assert news_on_page[0].comment_count == Comment.objects.count()
+    assert 'Комментариев: 101' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_home_page_shows_teaser_without_text(client):
+    """На главной выводится анонс, полный текст новостей не загружается."""
+    words = [f'слово{index}' for index in range(100)]
+    News.objects.create(title='Длинная', text=' '.join(words))
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse(HOME_URL))
+    content = response.content.decode()
+    assert ' '.join(words[:15]) + ' …' in content
+    assert words[15] not in content
+    news_query = next(
+        query['sql'] for query in queries
+        if 'FROM "news_news"' in query['sql']
+    )
+    assert '"news_news"."text"' not in news_query
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        '',
+        'Одно',
+        ' '.join(['слово'] * TEASER_WORDS),
+        ' '.join(['слово'] * (TEASER_WORDS + 1)),
+        '  Текст\nс переводами\tстрок\u00a0и  пробелами ' * 10,
+    ),
+)
+def test_make_teaser_matches_truncatewords(text):
+    """Анонс совпадает с результатом фильтра truncatewords."""
+    assert make_teaser(text) == truncatewords(text, TEASER_WORDS)
+
+
+@pytest.mark.django_db
+def test_teaser_follows_text(news):
+    """Анонс пересчитывается при сохранении, в том числе частичном."""
+    assert news.teaser == news.text
+    news.text = 'Новый текст'
+    news.save(update_fields=('text',))
+    news.refresh_from_db()
+    assert news.teaser == 'Новый текст'
+
+
 @pytest.mark.django_db
 @pytest.mark.usefixtures('comments_list')
+@pytest.mark.parametrize(
+    'comments_list', (2, LARGE_LIST_SIZE), indirect=True
+)
 @pytest.mark.parametrize(
     'name, args',
     (
@@ -63,6 +159,42 @@ def test_comments_order(
         assert first_param.created == second_param.created
 
 
+@pytest.mark.django_db
+def test_comments_keyset_pagination(client, news, author):
+    """
+    Комментарии выводятся порциями: на странице новости первая порция,
+    остальные подгружаются по курсору без пропусков и повторов.
+    """
+    page_size = settings.COMMENTS_COUNT_ON_PAGE
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(page_size * 2 + 1)
+    )
+    response = client.get(reverse(settings.DETAIL_URL, args=(news.pk,)))
+    shown = list(response.context['comments'])
+    assert len(shown) == page_size
+    cursor = response.context['next_cursor']
+    more_url = reverse('news:comments', args=(news.pk,))
+    while cursor:
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(more_url, {'after': cursor})
+        assert len(queries) == 1
+        shown += response.context['comments']
+        cursor = response.context['next_cursor']
+    expected = list(
+        Comment.objects.filter(news=news).order_by('created', 'pk')
+    )
+    assert shown == expected
+
+
+@pytest.mark.django_db
+def test_comments_bad_cursor(client, news):
+    """Некорректный курсор приводит к ошибке 400."""
+    url = reverse('news:comments', args=(news.pk,))
+    response = client.get(url, {'after': 'not-a-cursor'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     'user, form_allowed', (
@@ -91,3 +223,197 @@ def test_comment_form_contains_authorized_and_anonymous(
     assert result == form_allowed
     if 'form' in response.context:
         assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments_list')
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        (HOME_URL, None),
+        (settings.DETAIL_URL, pytest.lazy_fixture('pk_for_args_news')),
+    ),
+)
+def test_anonymous_page_cache(client, name, args):
+    """
+    Анонимный пользователь получает страницу из кеша без запросов к БД,
+    а при актуальных ETag или Last-Modified — ответ 304.
+    """
+    url = reverse(name, args=args)
+    response = client.get(url)
+    etag = response['ETag']
+    last_modified = response['Last-Modified']
+    with CaptureQueriesContext(connection) as queries:
+        cached_response = client.get(url)
+    assert len(queries) == 0
+    assert cached_response.content == response.content
+    assert cached_response['ETag'] == etag
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        (HOME_URL, None),
+        (settings.DETAIL_URL, pytest.lazy_fixture('pk_for_args_news')),
+    ),
+)
+def test_authorized_user_page_not_cached(author_client, name, args):
+    """Авторизованный пользователь всегда получает свежую страницу."""
+    url = reverse(name, args=args)
+    author_client.get(url)
+    response = author_client.get(url)
+    assert response.context is not None
+    assert 'ETag' not in response
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments_list')
+@pytest.mark.parametrize(
+    'name, sync_view, async_view',
+    (
+        (HOME_URL, NewsList.as_view(), news_list_async),
+        (settings.DETAIL_URL, NewsDetailView.as_view(), news_detail_async),
+    ),
+)
+def test_async_views_render_same_page(
+    rf,
+    news,
+    name,
+    sync_view,
+    async_view
+):
+    """
+    Асинхронные версии страниц отдают то же, что и синхронные,
+    и не обращаются к БД из цикла событий.
+    """
+    kwargs = {'pk': news.pk} if name == settings.DETAIL_URL else {}
+    url = reverse(name, kwargs=kwargs)
+    responses = []
+    for view in (sync_view, async_to_sync(async_view)):
+        cache.clear()
+        request = rf.get(url)
+        request.user = AnonymousUser()
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        responses.append(response)
+    sync_response, async_response = responses
+    assert async_response.status_code == HTTPStatus.OK
+    assert async_response.content == sync_response.content
+    assert async_response['ETag'] == sync_response['ETag']
+    assert async_response['Last-Modified'] == sync_response['Last-Modified']
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments_list')
+def test_async_views_with_database_cache(rf, settings, news):
+    """
+    С синхронным бэкендом кеша асинхронные страницы не обращаются
+    к кешу из цикла событий: ни при отрисовке фрагментов, ни при
+    сохранении страницы.
+    """
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'news_cache',
+    }}
+    call_command('createcachetable', verbosity=0)
+    for name, view, kwargs in (
+        (HOME_URL, news_list_async, {}),
+        (settings.DETAIL_URL, news_detail_async, {'pk': news.pk}),
+    ):
+        request = rf.get(reverse(name, kwargs=kwargs))
+        request.user = AnonymousUser()
+        for _ in range(2):
+            response = async_to_sync(view)(request, **kwargs)
+            assert response.status_code == HTTPStatus.OK
+            assert 'ETag' in response
+
+
+@pytest.fixture
+def search_news_list(author):
+    apples = News.objects.create(
+        title='Яблоки', text='Урожай яблок: яблоки, яблоки и яблоки.'
+    )
+    harvest = News.objects.create(
+        title='Урожай', text='Собрали много яблоки и груш.'
+    )
+    weather = News.objects.create(title='Погода', text='Дожди.')
+    Comment.objects.create(
+        news=weather, author=author, text='А яблоки от дождей лопаются.'
+    )
+    return apples, harvest, weather
+
+
+def search(client, **params):
+    response = client.get(reverse('news:search'), params)
+    return response.context
+
+
+@pytest.mark.django_db
+def test_news_search_ranked(client, search_news_list):
+    """Более релевантные новости выводятся первыми."""
+    apples, harvest, weather = search_news_list
+    context = search(client, q='яблоки')
+    assert context['object_list'] == [apples, harvest]
+    assert search(client, q='ЯБЛОКИ груш')['object_list'] == [harvest]
+
+
+@pytest.mark.django_db
+def test_news_search_with_comments(client, search_news_list):
+    """По желанию новости ищутся и по тексту комментариев."""
+    apples, harvest, weather = search_news_list
+    assert search(client, q='лопаются')['object_list'] == []
+    context = search(client, q='яблоки', comments='1')
+    assert context['object_list'] == [apples, harvest, weather]
+
+
+@pytest.mark.django_db
+def test_news_search_pages(client, settings, search_news_list):
+    """Результаты поиска выводятся постранично."""
+    settings.NEWS_SEARCH_PAGE_SIZE = 1
+    apples, harvest, weather = search_news_list
+    first = search(client, q='яблоки')
+    assert (first['object_list'], first['has_next']) == ([apples], True)
+    second = search(client, q='яблоки', page=2)
+    assert (second['object_list'], second['has_next']) == ([harvest], False)
+
+
+@pytest.mark.django_db
+def test_news_search_index_follows_changes(client, search_news_list):
+    """Индекс обновляется при изменении и удалении новостей."""
+    apples, harvest, weather = search_news_list
+    harvest.text = 'Собрали много груш.'
+    harvest.save()
+    assert search(client, q='яблоки')['object_list'] == [apples]
+    apples.delete()
+    assert search(client, q='яблоки')['object_list'] == []
+
+
+@pytest.mark.django_db
+def test_news_search_fallback(client, search_news_list):
+    """Без индекса поиск работает через вхождение подстроки."""
+    apples, harvest, weather = search_news_list
+    with mock.patch('news.search.fts_available', return_value=False):
+        context = search(client, q='яблоки', comments='1')
+    assert set(context['object_list']) == {apples, harvest, weather}
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('search_news_list')
+def test_news_search_fts_errors():
+    """
+    Запрос, который FTS5 не разобрал, ничего не находит, остальные
+    ошибки базы не скрываются поиском по подстроке.
+    """
+    with mock.patch('news.search.fts_query', return_value='яблоки AND'):
+        assert search_news('яблоки') == ([], False)
+    with mock.patch(
+        'news.search.NEWS_RANKED_SQL',
+        'SELECT id FROM missing WHERE %s AND %s AND %s'
+    ), pytest.raises(OperationalError, match='no such table'):
+        search_news('яблоки')
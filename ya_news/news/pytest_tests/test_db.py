@@ -0,0 +1,68 @@
+import os
+import sqlite3
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from news.models import News
+from yanews.sqlite3.base import table_exists, write_atomic
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas(settings):
+    """Настройки SQLITE_PRAGMAS применяются к соединению."""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        # 1 — NORMAL.
+        assert cursor.fetchone()[0] == 1
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout = settings.SQLITE_PRAGMAS['busy_timeout']
+        assert cursor.fetchone()[0] == busy_timeout
+
+
+@pytest.mark.django_db
+def test_missing_table_is_checked_again(django_assert_num_queries):
+    """Отсутствие таблицы не запоминается, найденная — запоминается."""
+    assert not table_exists('news_late_table')
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TABLE news_late_table (id integer)')
+    assert table_exists('news_late_table')
+    with django_assert_num_queries(0):
+        assert table_exists('news_late_table')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_begin_immediate():
+    """
+    Блокировку на запись сразу берут только транзакции write_atomic,
+    читающие транзакции начинаются с обычного BEGIN.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            News.objects.count()
+        with write_atomic():
+            with write_atomic():
+                News.objects.count()
+        with transaction.atomic():
+            News.objects.count()
+    begins = [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('BEGIN')
+    ]
+    assert begins == ['BEGIN', 'BEGIN IMMEDIATE', 'BEGIN']
+
+
+@pytest.mark.django_db
+def test_test_database_snapshot():
+    """Мигрированная тестовая база сохраняется снимком."""
+    snapshot = connection.creation.snapshot_path()
+    assert os.path.exists(snapshot)
+    restored = sqlite3.connect(snapshot)
+    tables = {
+        name for name, in restored.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+    }
+    restored.close()
+    assert News._meta.db_table in tables
@@ -0,0 +1,76 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.pagination import encode_cursor
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Проверяется план запроса SQLite.'
+)
+
+
+def get_query_plans(client, url, data=None):
+    """Планы всех запросов к таблицам приложения при открытии страницы."""
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url, data)
+    plans = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            if '"news_' not in query['sql']:
+                continue
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+            plans.append(' | '.join(row[-1] for row in cursor.fetchall()))
+    return plans
+
+
+def assert_plans_use_indexes(plans, *index_names):
+    """Запросы не сканируют таблицы целиком и не сортируют результат."""
+    assert plans
+    for plan in plans:
+        assert 'TEMP B-TREE' not in plan, plan
+        for step in plan.split(' | '):
+            if step.startswith('SCAN'):
+                assert 'INDEX' in step, plan
+    all_plans = ' | '.join(plans)
+    for index_name in index_names:
+        assert index_name in all_plans, all_plans
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments_list')
+def test_home_page_uses_indexes(client):
+    """Главная страница выбирает новости по индексу (date desc, id)."""
+    plans = get_query_plans(client, reverse('news:home'))
+    assert_plans_use_indexes(plans, 'news_date_id_idx')
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('comments_list')
+def test_detail_page_uses_indexes(client, news):
+    """Комментарии к новости выбираются по индексу (news_id, created)."""
+    plans = get_query_plans(
+        client,
+        reverse(settings.DETAIL_URL, args=(news.pk,))
+    )
+    assert_plans_use_indexes(plans, 'comment_news_created_idx')
+
+
+@pytest.mark.django_db
+def test_comments_more_uses_indexes(client, comment):
+    """Подгрузка комментариев по курсору идёт по индексу."""
+    plans = get_query_plans(
+        client,
+        reverse('news:comments', args=(comment.news_id,)),
+        {'after': encode_cursor(comment)}
+    )
+    assert_plans_use_indexes(plans, 'comment_news_created_idx')
+
+
+@pytest.mark.parametrize('name', ('news:edit', 'news:delete'))
+def test_comment_pages_use_indexes(author_client, comment, name):
+    """Страницы редактирования и удаления не сканируют комментарии."""
+    plans = get_query_plans(author_client, reverse(name, args=(comment.pk,)))
+    assert_plans_use_indexes(plans)
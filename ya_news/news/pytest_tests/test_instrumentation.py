@@ -0,0 +1,87 @@
+import asyncio
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from news.models import Comment
+from yanews.instrumentation import InstrumentationMiddleware
+
+LOGGER = 'yanews.instrumentation'
+
+
+@pytest.fixture
+def instrumentation(settings):
+    settings.INSTRUMENTATION_ENABLED = True
+    settings.INSTRUMENTATION_N_PLUS_ONE = 5
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('instrumentation', 'comments_list')
+def test_request_metrics(client, news, caplog):
+    """Метрики запроса попадают в Server-Timing и в лог."""
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        response = client.get(reverse('news:detail', args=(news.pk,)))
+    timing = response['Server-Timing']
+    assert timing.startswith('db;dur=')
+    assert 'tpl;dur=' in timing and 'total;dur=' in timing
+    record = json.loads(caplog.records[0].getMessage())
+    assert record['view'] == 'news:detail'
+    assert record['status'] == 200
+    assert record['queries'] > 0
+    assert record['template_ms'] > 0
+    assert record['total_ms'] >= record['db_ms']
+    assert f'desc="{record["queries"]} queries"' in timing
+    assert len(caplog.records) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('instrumentation', 'comments_list')
+def test_n_plus_one_is_logged(settings, caplog):
+    """Повторяющийся запрос для каждого комментария отмечается в логе."""
+    settings.INSTRUMENTATION_N_PLUS_ONE = Comment.objects.count()
+
+    def view(request):
+        authors = [comment.author.username
+                   for comment in Comment.objects.all()]
+        return HttpResponse(', '.join(authors))
+
+    middleware = InstrumentationMiddleware(view)
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        middleware(RequestFactory().get('/'))
+    warning = caplog.records[-1]
+    assert warning.levelno == logging.WARNING
+    repeated = json.loads(warning.getMessage())['repeated']
+    assert list(repeated.values()) == [Comment.objects.count()]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('instrumentation', 'comments_list')
+def test_async_request_metrics():
+    """
+    В асинхронной цепочке middleware остаётся асинхронным и считает
+    запросы, выполненные в потоке sync_to_async.
+    """
+    async def view(request):
+        count = await sync_to_async(Comment.objects.count)()
+        return HttpResponse(str(count))
+
+    middleware = InstrumentationMiddleware(view)
+    assert asyncio.iscoroutinefunction(middleware)
+    response = async_to_sync(middleware)(RequestFactory().get('/'))
+    assert 'desc="1 queries"' in response['Server-Timing']
+
+
+@pytest.mark.django_db
+def test_disabled_instrumentation(client, settings):
+    """Выключенный middleware не участвует в обработке запросов."""
+    settings.INSTRUMENTATION_ENABLED = False
+    with pytest.raises(MiddlewareNotUsed):
+        InstrumentationMiddleware(HttpResponse)
+    response = client.get(reverse('news:home'))
+    assert 'Server-Timing' not in response
@@ -2,16 +2,21 @@ from http import HTTPStatus
 
 import pytest
 from django.conf import settings
+from django.test import Client
 from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.forms import (
+    BAD_WORDS, WARNING, CommentForm, get_bad_words_pattern
+)
+from news.models import Comment, News
 
 COMMENT_TEXT = 'Текст комментария'
 DELETE_URL = 'news:delete'
 EDIT_URL = 'news:edit'
 COMMENT_CHANGING = 1
+# Сессия, пользователь, объект, запись изменений.
+COMMENT_WRITE_QUERIES = 4
 
 
 @pytest.mark.django_db
@@ -94,6 +99,40 @@ def test_user_cant_use_bad_words(author_client, name, args):
     assert comments_count == db_comment_data
 
 
+@pytest.fixture
+def bad_words_file(tmp_path, settings):
+    path = tmp_path / 'bad_words.txt'
+    path.write_text('# словарь модерации\nКозявка\nкоз\nбяка\n', 'utf-8')
+    settings.BAD_WORDS_FILE = str(path)
+    get_bad_words_pattern.cache_clear()
+    yield
+    get_bad_words_pattern.cache_clear()
+
+
+@pytest.mark.usefixtures('bad_words_file')
+@pytest.mark.parametrize(
+    'text, is_valid',
+    (
+        ('Обычный текст', True),
+        (f'Текст, {BAD_WORDS[0]}!', False),
+        (f'Текст {BAD_WORDS[-1].upper()}', False),
+        ('Какая БЯКА', False),
+        ('Коза', False),
+        ('Ко-за', True),
+        ('# словарь модерации', True),
+    ),
+)
+def test_bad_words_from_file(text, is_valid):
+    """
+    Запрещённые слова берутся из модуля и из файла, проверка
+    не зависит от регистра.
+    """
+    form = CommentForm(data={'text': text})
+    assert form.is_valid() == is_valid
+    if not is_valid:
+        assert form.errors['text'] == [WARNING]
+
+
 @pytest.mark.parametrize(
     'name, args',
     (
@@ -192,3 +231,105 @@ def test_other_user_cant_edit_comment(
     assert comment.text == note_from_db.text
     assert comment.author == author
     assert comment.news == news
+
+
+def test_comment_changes_refresh_home_page_cache(
+    author_client,
+    news,
+    form_data
+):
+    """
+    Блок новости на главной странице берётся из кеша и обновляется
+    после добавления, редактирования и удаления комментария.
+    """
+    home_url = reverse('news:home')
+    author_client.get(home_url)
+    News.objects.filter(pk=news.pk).update(title='Новый заголовок')
+    response = author_client.get(home_url)
+    assert 'Новый заголовок' not in response.content.decode()
+    author_client.post(
+        reverse(settings.DETAIL_URL, args=(news.pk,)),
+        data=form_data
+    )
+    response = author_client.get(home_url)
+    assert 'Новый заголовок' in response.content.decode()
+    assert 'Комментариев: 1' in response.content.decode()
+    comment = Comment.objects.get()
+    News.objects.filter(pk=news.pk).update(title='Заголовок')
+    author_client.post(reverse(EDIT_URL, args=(comment.pk,)), form_data)
+    response = author_client.get(home_url)
+    assert 'Новый заголовок' not in response.content.decode()
+    author_client.post(reverse(DELETE_URL, args=(comment.pk,)))
+    response = author_client.get(home_url)
+    assert 'Комментариев' not in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_model_changes_refresh_home_page_cache(client, news, author):
+    """
+    Кеш новости сбрасывается и при изменениях мимо страниц сайта:
+    сохранении новости и удалении её комментариев через ORM.
+    """
+    home_url = reverse('news:home')
+    Comment.objects.create(news=news, author=author, text='Текст')
+    client.get(home_url)
+    news.title = 'Новый заголовок'
+    news.save()
+    response = client.get(home_url)
+    assert 'Новый заголовок' in response.content.decode()
+    assert 'Комментариев: 1' in response.content.decode()
+    author.delete()
+    response = client.get(home_url)
+    assert 'Комментариев' not in response.content.decode()
+
+
+def test_comment_purges_anonymous_page_cache(
+    author_client,
+    news,
+    form_data
+):
+    """
+    Новый комментарий сбрасывает закешированные для анонимов
+    главную страницу и страницу новости.
+    """
+    client = Client()
+    home_url = reverse('news:home')
+    detail_url = reverse(settings.DETAIL_URL, args=(news.pk,))
+    detail_etag = client.get(detail_url)['ETag']
+    client.get(home_url)
+    author_client.post(detail_url, data=form_data)
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+    assert response.status_code == HTTPStatus.OK
+    assert form_data['text'] in response.content.decode()
+    response = client.get(home_url)
+    assert 'Комментариев: 1' in response.content.decode()
+
+
+@pytest.mark.parametrize(
+    'name, args, data',
+    (
+        (
+            settings.DETAIL_URL,
+            pytest.lazy_fixture('pk_for_args_news'),
+            pytest.lazy_fixture('form_data'),
+        ),
+        (
+            EDIT_URL,
+            pytest.lazy_fixture('pk_for_args_comment'),
+            pytest.lazy_fixture('form_data'),
+        ),
+        (DELETE_URL, pytest.lazy_fixture('pk_for_args_comment'), None),
+    ),
+)
+def test_comment_write_queries(
+    author_client,
+    django_assert_num_queries,
+    name,
+    args,
+    data
+):
+    """Создание, редактирование и удаление комментария без лишних запросов."""
+    url = reverse(name, args=args)
+    with django_assert_num_queries(COMMENT_WRITE_QUERIES):
+        response = author_client.post(url, data)
+    assert response.status_code == HTTPStatus.FOUND
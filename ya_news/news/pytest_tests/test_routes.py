@@ -10,10 +10,12 @@ from pytest_django.asserts import assertRedirects
     'name, args',
     (
         ('news:home', None),
+        ('news:search', None),
         ('users:login', None),
         ('users:logout', None),
         ('users:signup', None),
         ('news:detail', pytest.lazy_fixture('pk_for_args_news')),
+        ('news:comments', pytest.lazy_fixture('pk_for_args_news')),
     ),
 )
 def test_pages_availability_for_anonymous_user(client, name, args):
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.timezone import localtime
+
+from news.models import Comment, News
+from news.synthetic import generate, load_snapshot, save_snapshot
+
+User = get_user_model()
+
+
+def dump_db():
+    return (
+        list(News.objects.order_by('pk').values_list(
+            'title', 'text', 'teaser', 'date'
+        )),
+        list(Comment.objects.order_by('pk').values_list('text', 'created')),
+    )
+
+
+@pytest.mark.django_db
+def test_generate_is_deterministic():
+    """Одинаковый seed даёт одинаковые данные."""
+    generate(users=5, news=20, comments=50, seed=1)
+    expected = dump_db()
+    News.objects.all().delete()
+    generate(users=5, news=20, comments=50, seed=1)
+    assert dump_db() == expected
+    generate(users=5, news=20, comments=50, seed=2)
+    assert dump_db() != expected
+
+
+@pytest.mark.django_db
+def test_generated_comments_follow_news():
+    """Комментарии ссылаются на созданные новости и написаны после них."""
+    generate(users=5, news=20, comments=200)
+    for comment in Comment.objects.select_related('news'):
+        assert localtime(comment.created).date() >= comment.news.date
+    assert User.objects.count() == 5
+
+
+@pytest.mark.django_db(transaction=True)
+def test_snapshot_roundtrip(tmp_path):
+    """Снимок восстанавливает базу целиком."""
+    generate(users=5, news=20, comments=50)
+    expected = dump_db()
+    path = str(tmp_path / 'snapshot.sqlite3')
+    save_snapshot(path)
+    News.objects.all().delete()
+    load_snapshot(path)
+    assert dump_db() == expected
+
+
+@pytest.mark.synthetic(users=10, news=30, comments=300)
+def test_synthetic_db(client, synthetic_db):
+    """Фикстура заполняет базу по параметрам маркера."""
+    assert News.objects.count() == synthetic_db['news'] == 30
+    assert Comment.objects.count() == 300
+    response = client.get(reverse('news:home'))
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_synthetic_db_is_cleaned_up():
+    """После теста с synthetic_db база снова пустая."""
+    assert not News.objects.exists()
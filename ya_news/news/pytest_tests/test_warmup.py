@@ -0,0 +1,27 @@
+from unittest import mock
+
+import pytest
+from django.template.loaders.filesystem import Loader
+from django.urls import reverse
+
+from yanews import settings_production
+from yanews.warmup import warm_up
+
+
+@pytest.fixture
+def production_templates(settings):
+    """Кеширующий загрузчик шаблонов, как в settings_production."""
+    settings.TEMPLATES = settings_production.TEMPLATES
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('production_templates')
+def test_warm_up_compiles_all_templates(client):
+    """После прогрева страницы не читают шаблоны с диска."""
+    assert warm_up() > 0
+    with mock.patch.object(
+        Loader, 'get_contents', side_effect=AssertionError
+    ) as get_contents:
+        for name in ('news:home', 'users:login', 'news:search'):
+            client.get(reverse(name))
+    get_contents.assert_not_called()
@@ -0,0 +1,88 @@
+import re
+
+from django.db import OperationalError, connection
+from django.db.models import Q
+
+from yanews.sqlite3.base import table_exists
+
+from .models import LIST_FIELDS, News
+
+TOKEN_RE = re.compile(r'\w+')
+FTS_TABLE = 'news_news_fts'
+# Начало сообщения SQLite о запросе, который FTS5 не смог разобрать.
+FTS_SYNTAX_ERROR = 'fts5: syntax error'
+# Совпадение в комментарии весит меньше совпадения в самой новости:
+# bm25 в FTS5 отрицателен, чем меньше значение, тем выше новость.
+COMMENT_WEIGHT = 0.5
+NEWS_SQL = (
+    'SELECT rowid AS news_id, rank AS score '
+    'FROM news_news_fts WHERE news_news_fts MATCH %s'
+)
+COMMENTS_SQL = (
+    'SELECT news_comment.news_id, news_comment_fts.rank * %s '
+    'FROM news_comment_fts '
+    'JOIN news_comment ON news_comment.id = news_comment_fts.rowid '
+    'WHERE news_comment_fts MATCH %s'
+)
+NEWS_RANKED_SQL = (
+    'SELECT news_id FROM (' + NEWS_SQL + ') '
+    'ORDER BY score, news_id LIMIT %s OFFSET %s'
+)
+WITH_COMMENTS_RANKED_SQL = (
+    'SELECT news_id FROM (' + NEWS_SQL + ' UNION ALL ' + COMMENTS_SQL + ') '
+    'GROUP BY news_id ORDER BY MIN(score), news_id LIMIT %s OFFSET %s'
+)
+
+
+def fts_available():
+    return (
+        connection.vendor == 'sqlite'
+        and table_exists(FTS_TABLE)
+    )
+
+
+def fts_query(tokens):
+    """Все слова запроса обязательны, последнее ищется по префиксу."""
+    phrases = [f'"{token}"' for token in tokens]
+    phrases[-1] += '*'
+    return ' '.join(phrases)
+
+
+def search_news(query, with_comments=False, page=1, page_size=10):
+    """
+    Новости, в которых есть все слова запроса, и признак следующей страницы.
+
+    При with_comments новость находится и по тексту её комментариев.
+    В SQLite поиск идёт по индексам FTS5 и упорядочен по релевантности,
+    на других базах и без FTS5 — по вхождению подстроки, свежие новости
+    первыми. Запрос, который FTS5 не разобрал, ничего не находит.
+    """
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return [], False
+    offset = (page - 1) * page_size
+    if fts_available():
+        match = fts_query(tokens)
+        sql, params = NEWS_RANKED_SQL, [match]
+        if with_comments:
+            sql = WITH_COMMENTS_RANKED_SQL
+            params += [COMMENT_WEIGHT, match]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params + [page_size + 1, offset])
+                ids = [row[0] for row in cursor.fetchall()]
+        except OperationalError as error:
+            if not str(error).startswith(FTS_SYNTAX_ERROR):
+                raise
+            return [], False
+        news = News.objects.only(*LIST_FIELDS).in_bulk(ids[:page_size])
+        found = [news[pk] for pk in ids[:page_size] if pk in news]
+        return found, len(ids) > page_size
+    news = News.objects.only(*LIST_FIELDS)
+    for token in tokens:
+        condition = Q(title__icontains=token) | Q(text__icontains=token)
+        if with_comments:
+            condition |= Q(comment__text__icontains=token)
+        news = news.filter(condition)
+    found = list(news.distinct()[offset:offset + page_size + 1])
+    return found[:page_size], len(found) > page_size
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_news_cache
+from .models import Comment, News
+
+
+@receiver((post_save, post_delete), sender=News)
+def news_changed(sender, instance, **kwargs):
+    """Изменение новости из любого места сбрасывает её кеш."""
+    invalidate_news_cache(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """
+    Комментарий меняет счётчик и список комментариев новости, в том числе
+    при каскадном удалении и правке из админки.
+    """
+    invalidate_news_cache(instance.news_id)
@@ -0,0 +1,276 @@
+"""
+Синтетические пользователи, новости и комментарии для нагрузочных
+тестов и бенчмарков.
+
+Данные детерминированы: одинаковые параметры и seed дают одинаковую
+базу. Объекты создаются генераторами и пишутся порциями через
+bulk_create, поэтому расход памяти не зависит от объёма данных.
+Готовую базу можно сохранить снимком SQLite и потом восстанавливать
+вместо повторной генерации.
+"""
+import hashlib
+import json
+import os
+import random
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Comment, News, make_teaser
+
+# Меняется вместе с алгоритмом генерации, чтобы старые снимки
+# не восстанавливались вместо новых данных.
+GENERATOR_VERSION = 1
+BATCH_SIZE = 5000
+ALPHABET_CONSONANTS = 'бвгдзклмнпрстфхцчшщ'
+ALPHABET_VOWELS = 'аеиоуыэюя'
+VOCABULARY_SIZE = 20_000
+END_DATE = date(2025, 1, 1)
+DAYS = 3 * 365
+# Чем больше показатель, тем сильнее перекос: доля комментариев
+# у первого процента — 0.01 ** (1 / SKEW). На 1% самых свежих
+# новостей приходится 10% комментариев, 1% пользователей пишет 16%.
+HOT_SKEW = 2
+AUTHOR_SKEW = 2.5
+# Медиана длины новости — около 55 слов, комментария — около 12.
+NEWS_WORDS = (4, 0.8)
+COMMENT_WORDS = (2.5, 0.7)
+MAX_WORDS = 2000
+# Комментарии появляются в среднем через 12 часов после новости.
+COMMENT_DELAY_HOURS = 12
+
+User = get_user_model()
+
+
+def make_vocabulary(rng):
+    """
+    Слова из кириллических слогов и накопленные веса по закону Ципфа,
+    как в обычных текстах.
+    """
+    words = [
+        ''.join(
+            rng.choice(ALPHABET_CONSONANTS) + rng.choice(ALPHABET_VOWELS)
+            for _ in range(rng.randint(1, 4))
+        )
+        for _ in range(VOCABULARY_SIZE)
+    ]
+    weights = list(accumulate(
+        1 / rank for rank in range(1, VOCABULARY_SIZE + 1)
+    ))
+    return words, weights
+
+
+def make_words(rng, vocabulary, count):
+    words, weights = vocabulary
+    return rng.choices(words, cum_weights=weights, k=count)
+
+
+def make_text(rng, vocabulary, length):
+    """Текст из предложений по 5–15 слов, длина — логнормальная."""
+    count = min(max(int(rng.lognormvariate(*length)), 1), MAX_WORDS)
+    words = make_words(rng, vocabulary, count)
+    sentences = []
+    start = 0
+    while start < count:
+        end = start + rng.randint(5, 15)
+        sentences.append(' '.join(words[start:end]).capitalize() + '.')
+        start = end
+    return ' '.join(sentences)
+
+
+def make_title(rng, vocabulary, max_length):
+    title = ' '.join(make_words(rng, vocabulary, rng.randint(3, 7)))
+    return title[:max_length].strip().capitalize()
+
+
+def skewed_index(rng, count, skew):
+    """
+    Номер от 0 до count - 1, малые номера выпадают чаще.
+
+    Степенное распределение без таблицы весов: память не зависит
+    от count.
+    """
+    return int(count * rng.random() ** skew)
+
+
+def news_date(index, count):
+    """Новости равномерно распределены по DAYS дням до END_DATE."""
+    return END_DATE - timedelta(days=(count - 1 - index) * DAYS // count)
+
+
+@lru_cache(maxsize=DAYS + 1)
+def day_start(day):
+    """Начало дня в текущем часовом поясе; make_aware в pytz медленный."""
+    return timezone.make_aware(datetime.combine(day, time()))
+
+
+def first_pk(model):
+    return (model.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+
+def generate_users(start, count):
+    joined = day_start(END_DATE - timedelta(days=DAYS))
+    for index in range(count):
+        yield User(
+            pk=start + index,
+            username=f'user{start + index}',
+            password=UNUSABLE_PASSWORD_PREFIX,
+            date_joined=joined + timedelta(minutes=index),
+        )
+
+
+def generate_news(rng, vocabulary, start, count):
+    max_length = News._meta.get_field('title').max_length
+    for index in range(count):
+        text = make_text(rng, vocabulary, NEWS_WORDS)
+        yield News(
+            pk=start + index,
+            title=make_title(rng, vocabulary, max_length),
+            text=text,
+            teaser=make_teaser(text),
+            date=news_date(index, count),
+        )
+
+
+def generate_comments(rng, vocabulary, news, users, count):
+    """
+    Комментарии к новостям news = (первый pk, число) от пользователей
+    users = (первый pk, число).
+
+    Больше всего комментариев у самых свежих новостей и у небольшой
+    доли активных пользователей.
+    """
+    news_start, news_count = news
+    users_start, users_count = users
+    for _ in range(count):
+        index = news_count - 1 - skewed_index(rng, news_count, HOT_SKEW)
+        published = day_start(news_date(index, news_count))
+        delay = rng.expovariate(1 / COMMENT_DELAY_HOURS)
+        yield Comment(
+            news_id=news_start + index,
+            author_id=users_start + skewed_index(
+                rng, users_count, AUTHOR_SKEW
+            ),
+            text=make_text(rng, vocabulary, COMMENT_WORDS),
+            created=published + timedelta(hours=delay),
+        )
+
+
+def write(model, objects, batch_size=BATCH_SIZE, progress=None):
+    """
+    Сохраняет объекты порциями по batch_size, каждую — своей транзакцией.
+
+    progress(model, saved) вызывается после каждой порции.
+    """
+    saved = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return saved
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        saved += len(batch)
+        if progress:
+            progress(model, saved)
+
+
+def generate(users, news, comments, seed=0, batch_size=BATCH_SIZE,
+             progress=None):
+    """
+    Создаёт users пользователей, news новостей и comments комментариев.
+
+    У каждой модели свой генератор случайных чисел, поэтому, например,
+    число комментариев не меняет сами новости.
+    """
+    if comments and not (users and news):
+        raise ValueError(
+            'Для комментариев нужны новые пользователи и новости.'
+        )
+    vocabulary = make_vocabulary(random.Random(f'{seed}-vocabulary'))
+    users_start = first_pk(User)
+    news_start = first_pk(News)
+    write(
+        User,
+        generate_users(users_start, users),
+        batch_size, progress
+    )
+    write(
+        News,
+        generate_news(
+            random.Random(f'{seed}-news'), vocabulary, news_start, news
+        ),
+        batch_size, progress
+    )
+    write(
+        Comment,
+        generate_comments(
+            random.Random(f'{seed}-comments'), vocabulary,
+            (news_start, news), (users_start, users), comments
+        ),
+        batch_size, progress
+    )
+    reset_sequences()
+
+
+def reset_sequences():
+    """После вставки с явными pk обновляем счётчики первичных ключей."""
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [User, News, Comment]
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def snapshot_name(**params):
+    """
+    Имя файла снимка для параметров генерации.
+
+    В имя входят версия генератора и последние миграции, так что после
+    изменения схемы старый снимок не подойдёт.
+    """
+    migrations = sorted(
+        MigrationLoader(connection, ignore_no_migrations=True)
+        .graph.leaf_nodes()
+    )
+    key = json.dumps(
+        [GENERATOR_VERSION, migrations, sorted(params.items())]
+    )
+    return f'{hashlib.md5(key.encode()).hexdigest()}.sqlite3'
+
+
+def raw_connection():
+    if connection.vendor != 'sqlite':
+        raise ValueError('Снимки поддерживаются только для SQLite.')
+    connection.ensure_connection()
+    return connection.connection
+
+
+def save_snapshot(path):
+    """Копирует текущую базу в файл снимка."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.tmp'
+    target = sqlite3.connect(temporary)
+    try:
+        raw_connection().backup(target)
+    finally:
+        target.close()
+    os.replace(temporary, path)
+
+
+def load_snapshot(path):
+    """Заменяет содержимое текущей базы содержимым снимка."""
+    source = sqlite3.connect(path)
+    try:
+        source.backup(raw_connection())
+    finally:
+        source.close()
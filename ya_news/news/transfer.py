@@ -0,0 +1,126 @@
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comment, News, make_teaser
+
+NEWS = 'news'
+COMMENT = 'comment'
+CSV_FIELDS = (
+    'model', 'id', 'title', 'text', 'date', 'news_id', 'author', 'created'
+)
+FORMATS = ('jsonl', 'csv')
+NEWS_VALUES = ('id', 'title', 'text', 'date')
+COMMENT_VALUES = ('id', 'news_id', 'author__username', 'text', 'created')
+
+User = get_user_model()
+
+
+def news_to_record(values):
+    """Запись о новости из словаря с полями NEWS_VALUES."""
+    return {
+        'model': NEWS,
+        'id': values['id'],
+        'title': values['title'],
+        'text': values['text'],
+        'date': values['date'].isoformat(),
+    }
+
+
+def comment_to_record(values):
+    """
+    Запись о комментарии из словаря с полями COMMENT_VALUES.
+
+    Автор выгружается по имени пользователя.
+    """
+    return {
+        'model': COMMENT,
+        'id': values['id'],
+        'news_id': values['news_id'],
+        'author': values['author__username'],
+        'text': values['text'],
+        'created': values['created'].isoformat(),
+    }
+
+
+def record_to_news(record):
+    """Новость для bulk_create, который не вызывает save()."""
+    return News(
+        pk=int(record['id']),
+        title=record['title'],
+        text=record['text'],
+        teaser=make_teaser(record['text']),
+        date=parse_date(record['date']),
+    )
+
+
+def record_to_comment(record, author_ids):
+    return Comment(
+        pk=int(record['id']),
+        news_id=int(record['news_id']),
+        author_id=author_ids[record['author']],
+        text=record['text'],
+        created=parse_datetime(record['created']),
+    )
+
+
+def get_author_ids(usernames):
+    """
+    Возвращает id пользователей по именам, недостающих создаёт.
+
+    Все имена обрабатываются двумя-тремя запросами на порцию записей.
+    """
+    usernames = set(usernames)
+    author_ids = dict(
+        User.objects.filter(
+            username__in=usernames
+        ).values_list('username', 'pk')
+    )
+    missing = usernames - author_ids.keys()
+    if missing:
+        User.objects.bulk_create(
+            (User(username=username) for username in missing),
+            ignore_conflicts=True,
+        )
+        author_ids.update(
+            User.objects.filter(
+                username__in=missing
+            ).values_list('username', 'pk')
+        )
+    return author_ids
+
+
+def write_records(file, records, file_format):
+    """Пишет записи в файл построчно, не накапливая их в памяти."""
+    if file_format == 'csv':
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            yield record
+        return
+    for record in records:
+        file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        yield record
+
+
+def read_header(lines):
+    """Заголовок CSV: имена столбцов из первой строки."""
+    return next(csv.reader(lines), [])
+
+
+def read_records(lines, file_format, header=None):
+    """
+    Читает записи по одной из итератора строк.
+
+    Для CSV можно передать заголовок, прочитанный раньше: тогда
+    чтение продолжается с середины файла.
+    """
+    if file_format == 'csv':
+        yield from csv.DictReader(lines, header)
+        return
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
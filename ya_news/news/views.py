@@ -1,14 +1,64 @@
+from datetime import datetime, time
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, HttpResponseNotAllowed
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 from django.views import generic
 
+from .cache import (
+    cache_anonymous_page, cache_page_response, conditional_response,
+    get_cached_page, get_news_versions, is_cacheable_request
+)
 from .forms import CommentForm
-from .models import Comment, News
+from .models import LIST_FIELDS, Comment, News
+from .pagination import get_comments_page
+from .search import search_news
+
+
+def last_comment_created():
+    """Подзапрос: время создания последнего комментария к новости."""
+    return Subquery(
+        Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by('-created').values('created')[:1]
+    )
+
+
+def news_last_modified(news):
+    """Время последнего изменения новости с учётом комментариев."""
+    modified = timezone.make_aware(datetime.combine(news.date, time.min))
+    if news.last_comment and news.last_comment > modified:
+        return news.last_comment
+    return modified
+
+
+class LastModifiedMixin:
+    """
+    Выставляет заголовок Last-Modified по данным страницы.
 
+    Представление определяет get_last_modified: время последнего
+    изменения показанных данных или None, если их нет.
+    """
 
-class NewsList(generic.ListView):
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        last_modified = self.get_last_modified()
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+
+@method_decorator(cache_anonymous_page, name='dispatch')
+class NewsList(LastModifiedMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
@@ -18,23 +68,69 @@ class NewsList(generic.ListView):
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
+        Для каждой новости подсчитываем только количество комментариев,
+        не загружая сами комментарии. Подсчёт выполняется подзапросом,
+        чтобы выборка последних новостей шла по индексу без сортировки.
+        Полный текст новостей не загружается: выводится только анонс.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
+        comment_count = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=Count('pk')
+        ).values('count')
+        return self.model.objects.only(*LIST_FIELDS).annotate(
+            comment_count=Coalesce(Subquery(comment_count), 0),
+            last_comment=last_comment_created(),
         )[:settings.NEWS_COUNT_ON_HOME_PAGE]
 
+    def get_context_data(self, **kwargs):
+        """Передаём версии кеша, по которым кешируются блоки новостей."""
+        context = super().get_context_data(**kwargs)
+        news_list = context['object_list']
+        versions = get_news_versions(news.pk for news in news_list)
+        for news in news_list:
+            news.cache_version = versions[news.pk]
+        context['fragment_timeout'] = settings.NEWS_FRAGMENT_CACHE_TIMEOUT
+        return context
+
+    def get_last_modified(self):
+        return max(
+            (news_last_modified(news) for news in self.object_list),
+            default=None
+        )
 
-class NewsDetail(generic.DetailView):
+
+class CommentsPageMixin:
+    """Добавляет в контекст первую порцию комментариев к новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        comments, next_cursor = get_comments_page(self.object.pk)
+        context['news_id'] = self.object.pk
+        context['comments'] = comments
+        context['next_cursor'] = next_cursor
+        return context
+
+
+@method_decorator(cache_anonymous_page, name='dispatch')
+class NewsDetail(
+        LastModifiedMixin,
+        CommentsPageMixin,
+        generic.DetailView
+):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
         obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
+            self.model.objects.annotate(last_comment=last_comment_created()),
             pk=self.kwargs['pk']
         )
         return obj
 
+    def get_last_modified(self):
+        return news_last_modified(self.object)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.request.user.is_authenticated:
@@ -42,8 +138,25 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class NewsCommentsMore(generic.TemplateView):
+    """Следующая порция комментариев к новости."""
+    template_name = 'includes/comments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        comments, next_cursor = get_comments_page(
+            self.kwargs['pk'],
+            self.request.GET.get('after')
+        )
+        context['news_id'] = self.kwargs['pk']
+        context['comments'] = comments
+        context['next_cursor'] = next_cursor
+        return context
+
+
 class NewsComment(
         LoginRequiredMixin,
+        CommentsPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -63,8 +176,9 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
@@ -78,19 +192,53 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
+class NewsSearch(generic.TemplateView):
+    """Поиск по новостям и, по желанию, по комментариям."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '')
+        with_comments = bool(self.request.GET.get('comments'))
+        try:
+            page = max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            raise BadRequest('Некорректный номер страницы.')
+        found, has_next = search_news(
+            query,
+            with_comments=with_comments,
+            page=page,
+            page_size=settings.NEWS_SEARCH_PAGE_SIZE,
+        )
+        context.update({
+            'query': query,
+            'with_comments': with_comments,
+            'object_list': found,
+            'page': page,
+            'has_next': has_next,
+        })
+        return context
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
-        """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими комментариями.
+
+        Новость загружается тем же запросом: её заголовок выводится
+        на страницах редактирования и удаления.
+        """
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -102,3 +250,67 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+
+def render_page(view_class, request, kwargs):
+    """
+    Синхронная часть асинхронной страницы.
+
+    Загрузка пользователя, проверка кеша, запросы к БД, отрисовка
+    шаблона с его кешируемыми фрагментами и сохранение страницы в кеш
+    выполняются за один переход в поток: бэкенд кеша может быть
+    синхронным (база данных, файлы, memcached), а отрисовка нагружает
+    процессор и не должна занимать цикл событий.
+    """
+    cacheable = is_cacheable_request(request)
+    if cacheable:
+        entry = get_cached_page(request)
+        if entry is not None:
+            return conditional_response(request, entry)
+    view = view_class()
+    view.setup(request, **kwargs)
+    response = view.get(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if cacheable:
+        response = cache_page_response(request, response)
+    return plain_response(response)
+
+
+def plain_response(response):
+    """
+    Копия отрендеренного ответа без метода render, чтобы обработчик
+    Django не рендерил его ещё раз в отдельном потоке.
+    """
+    if not hasattr(response, 'render'):
+        return response
+    plain = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        plain[header] = value
+    plain.cookies = response.cookies
+    return plain
+
+
+async def render_page_async(view_class, request, **kwargs):
+    """Страница целиком готовится в потоке, см. render_page."""
+    return await sync_to_async(render_page)(view_class, request, kwargs)
+
+
+async def news_list_async(request):
+    """Асинхронная версия NewsList."""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(('GET', 'HEAD'))
+    return await render_page_async(NewsList, request)
+
+
+async def news_detail_async(request, pk):
+    """
+    Асинхронная версия NewsDetailView.
+
+    Отправка комментария остаётся синхронной.
+    """
+    if request.method == 'POST':
+        return await sync_to_async(NewsComment.as_view())(request, pk=pk)
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(('GET', 'HEAD', 'POST'))
+    return await render_page_async(NewsDetail, request, pk=pk)
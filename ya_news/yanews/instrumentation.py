@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+    """Запросы к базе и время выполнения одного HTTP-запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0
+        self.template_time = 0
+        self.template_depth = 0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def repeated(self, threshold):
+        """Запросы, повторённые не меньше threshold раз: признак N+1."""
+        return {
+            sql: count for sql, count in self.statements.items()
+            if count >= threshold
+        }
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обёртка для connection.execute_wrappers: запрос учитывается
+    в метриках текущего HTTP-запроса, если они собираются.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder():
+    """
+    Добавляет record_query к соединениям текущего потока.
+
+    Соединения Django у каждого потока свои, а метрики запроса
+    определяются через contextvars, поэтому обёртка одна на соединение
+    и запросы не приписываются чужим HTTP-запросам.
+    """
+    for connection in connections.all():
+        if record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    """
+    Шаблон, время отрисовки которого попадает в метрики текущего
+    HTTP-запроса. Учитывается только внешний вызов: шаблоны, которые
+    отрисовываются внутри другого шаблона, в сумму не добавляются.
+    """
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        metrics.template_depth += 1
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бэкенд шаблонов Django, который отдаёт TimedTemplate."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class InstrumentationMiddleware:
+    """
+    Число и время запросов к базе, время отрисовки шаблона и общее
+    время ответа для каждого запроса.
+
+    Метрики отдаются в заголовке Server-Timing и пишутся в лог строкой
+    JSON. Один и тот же SQL, выполненный INSTRUMENTATION_N_PLUS_ONE
+    или больше раз, пишется в лог как предупреждение. Время шаблонов
+    замеряет бэкенд TimedDjangoTemplates из настройки TEMPLATES, оно
+    включает запросы, которые выполняются во время отрисовки. Если
+    INSTRUMENTATION_ENABLED выключен, Django не включает middleware
+    в цепочку обработки.
+
+    Middleware работает и в синхронной, и в асинхронной цепочке:
+    под ASGI асинхронные view не переводятся в поток ради него.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django распознаёт асинхронный middleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        install_query_recorder()
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.report(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        # Синхронный код view выполняется в потоке sync_to_async
+        # с thread_sensitive, туда же ставится обёртка соединений.
+        await sync_to_async(install_query_recorder)()
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.report(request, response, metrics, start)
+
+    def report(self, request, response, metrics, start):
+        """Заголовок Server-Timing и записи в лог по метрикам запроса."""
+        total = perf_counter() - start
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={metrics.db_time * 1000:.1f};'
+            f'desc="{metrics.queries} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ))
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }, ensure_ascii=False))
+        repeated = metrics.repeated(settings.INSTRUMENTATION_N_PLUS_ONE)
+        if repeated:
+            logger.warning(json.dumps({
+                'n_plus_one': request.path,
+                'view': match.view_name if match else None,
+                'repeated': repeated,
+            }, ensure_ascii=False))
+        return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanews.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -34,7 +36,9 @@ ROOT_URLCONF = 'yanews.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, который замеряет время отрисовки для метрик
+        # запроса (см. INSTRUMENTATION_ENABLED).
+        'BACKEND': 'yanews.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -51,10 +55,54 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
-DATABASES = {
+# YANEWS_DB_ENGINE=postgres переключает проект на PostgreSQL
+# (нужен пакет psycopg2), по умолчанию используется файл SQLite.
+if os.getenv('YANEWS_DB_ENGINE', 'sqlite') == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('YANEWS_DB_NAME', 'yanews'),
+            'USER': os.getenv('YANEWS_DB_USER', 'yanews'),
+            'PASSWORD': os.getenv('YANEWS_DB_PASSWORD', ''),
+            'HOST': os.getenv('YANEWS_DB_HOST', 'localhost'),
+            'PORT': os.getenv('YANEWS_DB_PORT', '5432'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'yanews.sqlite3',
+            'NAME': os.getenv('YANEWS_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # Снимки мигрированной тестовой базы, см. yanews/sqlite3.
+            'TEST': {
+                'SNAPSHOT_DIR': os.getenv(
+                    'YANEWS_TEST_DB_SNAPSHOT_DIR', BASE_DIR / '.test_db_cache'
+                ),
+            },
+        }
+    }
+DATABASES['default'].update(
+    CONN_MAX_AGE=int(os.getenv('YANEWS_CONN_MAX_AGE', '0')),
+)
+
+# Применяются к каждому новому соединению с SQLite (см. yanews/sqlite3).
+# WAL позволяет читать во время записи, а busy_timeout — ждать
+# освобождения базы вместо ошибки «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.getenv('YANEWS_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'busy_timeout': int(os.getenv('YANEWS_SQLITE_BUSY_TIMEOUT', 20_000)),
+}
+
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv(
+            'YANEWS_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('YANEWS_CACHE_LOCATION', 'yanews'),
     }
 }
 
@@ -76,9 +124,38 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Метрики каждого запроса в заголовке Server-Timing и в логе.
+INSTRUMENTATION_ENABLED = os.getenv('YANEWS_INSTRUMENTATION', 'False') == 'True'
+# Сколько раз должен повториться один SQL, чтобы считаться N+1.
+INSTRUMENTATION_N_PLUS_ONE = int(os.getenv('YANEWS_N_PLUS_ONE_THRESHOLD', '10'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yanews.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# При True шаблоны и URLconf загружаются при старте воркера.
+WARM_UP_ON_START = False
+
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+COMMENTS_COUNT_ON_PAGE = 20
+NEWS_SEARCH_PAGE_SIZE = 10
+NEWS_FRAGMENT_CACHE_TIMEOUT = 60 * 15
+PAGE_CACHE_TIMEOUT = 60
+NEWS_ASYNC_VIEWS = os.getenv('YANEWS_ASYNC_VIEWS', 'False') == 'True'
+
+BAD_WORDS_FILE = os.getenv('YANEWS_BAD_WORDS_FILE')
 
 DETAIL_URL = 'news:detail'
@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.backends.sqlite3 import base
+
+from .creation import DatabaseCreation
+
+# (имя базы, имя таблицы) для таблиц, наличие которых уже проверено.
+_existing_tables = set()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с настройками для параллельной работы нескольких процессов.
+
+    Каждое новое соединение выполняет SQLITE_PRAGMAS. Транзакции
+    из write_atomic начинаются с BEGIN IMMEDIATE, остальные — с обычного
+    BEGIN, чтобы читающие транзакции не ждали блокировку на запись.
+    Тестовая база создаётся из снимка, см. DatabaseCreation.
+    """
+    creation_class = DatabaseCreation
+    begin_immediate = False
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        if self.begin_immediate:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
+
+
+@contextmanager
+def write_atomic(using=None):
+    """
+    transaction.atomic для транзакций, которые читают и затем пишут.
+
+    Блокировка на запись берётся сразу, с ожиданием по busy_timeout.
+    Иначе такая транзакция падает с «database is locked» при первой
+    записи, если базу успел изменить другой процесс. Внутри уже
+    открытой транзакции и на других бэкендах — обычный atomic.
+    """
+    connection = transaction.get_connection(using)
+    connection.begin_immediate = True
+    try:
+        with transaction.atomic(using):
+            # BEGIN уже выполнен, вложенные atomic работают как обычно.
+            connection.begin_immediate = False
+            yield
+    finally:
+        connection.begin_immediate = False
+
+
+def table_exists(name, using='default'):
+    """
+    Есть ли в базе SQLite таблица name, например индекс FTS5, который
+    миграции создают не всегда.
+
+    Запоминается только найденная таблица: отсутствующая может появиться
+    после migrate, тогда следующая проверка её увидит.
+    """
+    connection = connections[using]
+    key = (connection.settings_dict['NAME'], name)
+    if key in _existing_tables:
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [name]
+        )
+        exists = cursor.fetchone() is not None
+    if exists:
+        _existing_tables.add(key)
+    return exists
@@ -0,0 +1,52 @@
+import os
+
+from django.conf import settings
+from django.forms.renderers import get_default_renderer
+from django.template import engines
+from django.urls import get_resolver
+from django.utils import timezone, translation
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def template_names(directory):
+    """Имена всех шаблонов в каталоге, как их передают в get_template."""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(TEMPLATE_SUFFIXES):
+                path = os.path.relpath(os.path.join(root, name), directory)
+                yield path.replace(os.sep, '/')
+
+
+def loader_dirs(engine):
+    """Каталоги, в которых ищут шаблоны загрузчики движка."""
+    for loader in engine.engine.template_loaders:
+        for inner in getattr(loader, 'loaders', (loader,)):
+            if hasattr(inner, 'get_dirs'):
+                yield from inner.get_dirs()
+
+
+def warm_up():
+    """
+    Загружает URLconf, переводы, часовой пояс и компилирует все шаблоны.
+
+    Вызывается при старте воркера: с кеширующим загрузчиком шаблонов
+    первый запрос уже не читает и не разбирает шаблоны, включая шаблоны
+    виджетов форм. Возвращает число скомпилированных шаблонов.
+    """
+    # Обращение к reverse_dict импортирует URLconf и заполняет
+    # таблицы, по которым работает reverse().
+    get_resolver().reverse_dict
+    # pytz при первом обращении перебирает список всех часовых поясов.
+    timezone.get_default_timezone()
+    compiled = 0
+    with translation.override(settings.LANGUAGE_CODE):
+        for engine in (*engines.all(), get_default_renderer().engine):
+            names = dict.fromkeys(
+                name for directory in loader_dirs(engine)
+                for name in template_names(directory)
+            )
+            for name in names:
+                engine.get_template(name)
+                compiled += 1
+    return compiled
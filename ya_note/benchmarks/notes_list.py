@@ -0,0 +1,99 @@
+"""
+Время открытия списка заметок у пользователя с большим числом заметок.
+
+Данные создаются во временной базе. Запуск из каталога ya_note:
+
+    python -m benchmarks.notes_list --notes 50000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+BATCH_SIZE = 5000
+REPEAT = 20
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=50_000)
+    parser.add_argument('--users', type=int, default=3)
+    return parser.parse_args()
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    from django.conf import settings
+    django.setup()
+    settings.DATABASES['default']['NAME'] = db_path
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def create_notes(author, count, batch_size=BATCH_SIZE):
+    """Создаёт count заметок пользователя порциями через bulk_create."""
+    from notes.models import Note
+    for start in range(0, count, batch_size):
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text='Текст заметки. ' * 20,
+                author=author,
+                slug=f'{author.username}-{index}',
+            )
+            for index in range(start, min(start + batch_size, count))
+        )
+
+
+def measure(client, url, data=None):
+    """Медиана времени ответа в миллисекундах."""
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        client.get(url, data)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'db.sqlite3'))
+        from django.contrib.auth import get_user_model
+        from django.test import Client
+        from django.urls import reverse
+
+        from notes.models import Note
+        users = [
+            get_user_model().objects.create(username=f'user{index}')
+            for index in range(args.users)
+        ]
+        started = time.perf_counter()
+        for user in users:
+            create_notes(user, args.notes)
+        print(
+            f'Создано {args.notes} заметок у {args.users} пользователей '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
+        author = users[-1]
+        client = Client()
+        client.force_login(author)
+        url = reverse('notes:list')
+        ids = list(
+            Note.objects.filter(author=author).order_by('id').values_list(
+                'id', flat=True
+            )
+        )
+        for name, position in (
+            ('первая страница', None),
+            ('середина списка', len(ids) // 2),
+            ('конец списка', len(ids) - 5),
+        ):
+            data = None if position is None else {'after': ids[position]}
+            print(f'{name}: {measure(client, url, data):.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,407 @@
+"""
+Время ответа, число запросов к базе и выделенная память для каждого
+именованного маршрута проекта.
+
+Данные создаются во временной базе, их объём задают --notes и
+--users. Для каждого маршрута печатаются p50/p95/p99 времени ответа,
+число запросов и пик выделенной за запрос памяти (tracemalloc). Если
+у какого-то именованного маршрута нет замера, скрипт сообщает об этом
+и завершается с ошибкой.
+
+С --save результат записывается в файл базовой линии, без него
+сравнивается с сохранённым: больше запросов, чем в базовой линии,
+или медиана времени и память сверх допуска считаются регрессией,
+и скрипт завершается с кодом 1. Хвосты p95/p99 только печатаются:
+на общей машине они слишком шумные для автоматического сравнения.
+Время зависит от машины, поэтому базовая линия не хранится
+в репозитории: её сохраняют на той же машине (или в том же задании CI),
+где идёт сравнение. Запуск из каталога ya_note:
+
+    python -m benchmarks.routes --save
+    python -m benchmarks.routes
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from itertools import count
+from pathlib import Path
+
+from benchmarks.notes_list import create_notes
+
+BASELINE = Path(__file__).resolve().parent / 'routes_baseline.json'
+BATCH_SIZE = 5000
+MEMORY_REPEAT = 5
+# Замедление меньше этого не считается регрессией даже сверх допуска.
+MIN_SLOWDOWN_MS = 1
+# Маршруты этих пространств имён не замеряются.
+EXCLUDED_NAMESPACES = ('admin',)
+BATCH_OPERATIONS = 10
+# Номера для заголовков новых заметок: одинаковые заголовки замедляли
+# бы подбор slug от запроса к запросу.
+numbers = count()
+
+# prepare(client, dataset) вызывается перед каждым запросом вне замера
+# и возвращает аргументы маршрута и данные запроса.
+Route = namedtuple('Route', ('label', 'name', 'method', 'user', 'prepare'))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--notes', type=int, default=10_000,
+        help='Заметок у каждого пользователя.'
+    )
+    parser.add_argument('--users', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument(
+        '--save', action='store_true',
+        help='Записать результат как новую базовую линию.'
+    )
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='Допустимый рост p50, доля от базовой линии.'
+    )
+    parser.add_argument(
+        '--memory-tolerance', type=float, default=0.10,
+        help='Допустимый рост памяти, доля от базовой линии.'
+    )
+    args = parser.parse_args()
+    if args.repeat < 2:
+        parser.error('--repeat должен быть не меньше 2.')
+    return args
+
+
+def setup_django(db_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['testserver']
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def create_dataset(notes_count, users_count):
+    """
+    Пользователи с заметками; возвращает объекты, на которые ссылаются
+    маршруты. Замеры идут от имени последнего пользователя.
+    """
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+    users = [
+        get_user_model().objects.create(username=f'user{index}')
+        for index in range(users_count)
+    ]
+    for user in users:
+        create_notes(user, notes_count)
+    author = users[-1]
+    ids = list(
+        Note.objects.filter(author=author).order_by('id').values_list(
+            'id', flat=True
+        )
+    )
+    notes = Note.objects.filter(author=author).order_by('id')
+    return {
+        'users': {'author': author},
+        'note': notes.first(),
+        'batch_notes': list(notes[1:BATCH_OPERATIONS + 1]),
+        'middle': ids[len(ids) // 2],
+    }
+
+
+def new_note(author, prefix):
+    from notes.models import Note
+    number = next(numbers)
+    return Note.objects.create(
+        title=f'{prefix} {number}',
+        text='Текст заметки.',
+        author=author,
+        slug=f'{prefix.lower()}-{number}',
+    )
+
+
+def no_args(client, dataset):
+    return {}, None
+
+
+def note_kwargs(client, dataset):
+    return {'slug': dataset['note'].slug}, None
+
+
+def add_note(client, dataset):
+    """Slug подбирается по заголовку."""
+    return {}, {'title': f'Новая заметка {next(numbers)}', 'text': 'Текст.'}
+
+
+def edit_note(client, dataset):
+    note = dataset['note']
+    return {'slug': note.slug}, {
+        'title': note.title, 'text': 'Исправленный текст', 'slug': note.slug
+    }
+
+
+def note_to_delete(client, dataset):
+    """Каждый запрос удаляет свежую заметку."""
+    return {'slug': new_note(dataset['users']['author'], 'delete').slug}, None
+
+
+def list_middle(client, dataset):
+    return {}, {'after': dataset['middle']}
+
+
+def search(client, dataset):
+    return {}, {'q': 'заметка'}
+
+
+def batch(client, dataset):
+    """
+    Пакет из BATCH_OPERATIONS удалений, изменений и созданий; удаляемые
+    заметки создаются перед каждым запросом.
+    """
+    author = dataset['users']['author']
+    return {}, json.dumps({
+        'delete': [
+            new_note(author, 'batch').slug for _ in range(BATCH_OPERATIONS)
+        ],
+        'update': [
+            {'slug': note.slug, 'title': note.title, 'text': 'Из пакета'}
+            for note in dataset['batch_notes']
+        ],
+        'create': [
+            {'title': f'Из пакета {next(numbers)}', 'text': 'Текст.'}
+            for _ in range(BATCH_OPERATIONS)
+        ],
+    })
+
+
+def logged_in(client, dataset):
+    """Выход разлогинивает клиента, поэтому логиним его заново."""
+    client.force_login(dataset['users']['author'])
+    return {}, None
+
+
+ROUTES = (
+    Route('home', 'notes:home', 'get', None, no_args),
+    Route('home (author)', 'notes:home', 'get', 'author', no_args),
+    Route('add', 'notes:add', 'get', 'author', no_args),
+    Route('add (post)', 'notes:add', 'post', 'author', add_note),
+    Route('edit', 'notes:edit', 'get', 'author', note_kwargs),
+    Route('edit (post)', 'notes:edit', 'post', 'author', edit_note),
+    Route('detail', 'notes:detail', 'get', 'author', note_kwargs),
+    Route('delete', 'notes:delete', 'get', 'author', note_kwargs),
+    Route('delete (post)', 'notes:delete', 'post', 'author', note_to_delete),
+    Route('list', 'notes:list', 'get', 'author', no_args),
+    Route('list (middle)', 'notes:list', 'get', 'author', list_middle),
+    Route('success', 'notes:success', 'get', 'author', no_args),
+    Route('search', 'notes:search', 'get', 'author', search),
+    Route('search api', 'notes:search_api', 'get', 'author', search),
+    Route('batch api', 'notes:batch_api', 'post', 'author', batch),
+    Route('export api', 'notes:export_api', 'get', 'author', no_args),
+    Route('login', 'users:login', 'get', None, no_args),
+    Route('logout', 'users:logout', 'post', 'author', logged_in),
+    Route('signup', 'users:signup', 'get', None, no_args),
+)
+
+
+def url_names(resolver=None, prefix=''):
+    """Полные имена всех именованных маршрутов проекта."""
+    from django.urls import URLResolver, get_resolver
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if not isinstance(pattern, URLResolver):
+            if pattern.name:
+                yield prefix + pattern.name
+            continue
+        if pattern.namespace in EXCLUDED_NAMESPACES:
+            continue
+        namespace = f'{pattern.namespace}:' if pattern.namespace else ''
+        yield from url_names(pattern, prefix + namespace)
+
+
+def uncovered_routes(routes=ROUTES):
+    """Именованные маршруты, для которых нет замера."""
+    return sorted(set(url_names()) - {route.name for route in routes})
+
+
+def percentile(values, percent):
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def send(client, route, dataset):
+    """
+    Готовит запрос маршрута. Строка данных отправляется как JSON,
+    потоковый ответ вычитывается целиком, не накапливаясь в памяти.
+    """
+    from django.urls import reverse
+    kwargs, data = route.prepare(client, dataset)
+    method = getattr(client, route.method)
+    url = reverse(route.name, kwargs=kwargs)
+    extra = {'content_type': 'application/json'} if isinstance(
+        data, str
+    ) else {}
+
+    def request():
+        response = method(url, data, **extra)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+    return request
+
+
+def make_client(route, dataset):
+    """Клиент с пользователем маршрута; первый запрос прогревает маршрут."""
+    from django.test import Client
+    client = Client()
+    if route.user:
+        client.force_login(dataset['users'][route.user])
+    response = send(client, route, dataset)()
+    if response.status_code >= 400:
+        raise RuntimeError(f'{route.label}: ответ {response.status_code}')
+    return client
+
+
+def measure_memory(client, route, dataset):
+    """Число запросов и медиана пика выделенной за запрос памяти."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    peaks = []
+    for _ in range(MEMORY_REPEAT):
+        request = send(client, route, dataset)
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            try:
+                request()
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+    return len(queries), int(statistics.median(peaks))
+
+
+def measure(routes, dataset, repeat):
+    """
+    Время, число запросов и память для всех маршрутов.
+
+    Маршруты замеряются по очереди в каждом круге, чтобы фоновая
+    нагрузка на машину сказывалась на всех одинаково.
+    """
+    clients = [make_client(route, dataset) for route in routes]
+    timings = [[] for _ in routes]
+    for _ in range(repeat):
+        for route, client, route_timings in zip(routes, clients, timings):
+            request = send(client, route, dataset)
+            start = time.perf_counter()
+            request()
+            route_timings.append(time.perf_counter() - start)
+    results = {}
+    for route, client, route_timings in zip(routes, clients, timings):
+        queries, memory = measure_memory(client, route, dataset)
+        results[route.label] = {
+            'p50': round(percentile(route_timings, 50) * 1000, 3),
+            'p95': round(percentile(route_timings, 95) * 1000, 3),
+            'p99': round(percentile(route_timings, 99) * 1000, 3),
+            'queries': queries,
+            'memory': memory,
+        }
+    return results
+
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """Список регрессий относительно базовой линии."""
+    regressions = []
+    for label, result in results.items():
+        saved = baseline.get(label)
+        if saved is None:
+            continue
+        if result['queries'] > saved['queries']:
+            regressions.append(
+                f'{label}: запросов {result["queries"]} '
+                f'вместо {saved["queries"]}'
+            )
+        slower = result['p50'] - saved['p50']
+        if slower > max(saved['p50'] * tolerance, MIN_SLOWDOWN_MS):
+            regressions.append(
+                f'{label}: p50 {result["p50"]:.2f} мс '
+                f'вместо {saved["p50"]:.2f} мс'
+            )
+        if result['memory'] > saved['memory'] * (1 + memory_tolerance):
+            regressions.append(
+                f'{label}: память {result["memory"] / 1024:.0f} КБ '
+                f'вместо {saved["memory"] / 1024:.0f} КБ'
+            )
+    return regressions
+
+
+def print_results(results, baseline):
+    print(
+        f'{"маршрут":<20}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+        f'{"запросы":>10}{"память, КБ":>12}'
+    )
+    for label, result in results.items():
+        line = (
+            f'{label:<20}{result["p50"]:>10.2f}{result["p95"]:>10.2f}'
+            f'{result["p99"]:>10.2f}{result["queries"]:>10}'
+            f'{result["memory"] / 1024:>12.0f}'
+        )
+        saved = baseline.get(label)
+        if saved is not None:
+            line += (
+                f'   p50 {result["p50"] / saved["p50"] - 1:+.0%}, '
+                f'запросы {result["queries"] - saved["queries"]:+d}'
+            )
+        print(line)
+
+
+def main():
+    args = parse_args()
+    scale = {'notes': args.notes, 'users': args.users}
+    baseline = {}
+    if not args.save:
+        if not args.baseline.exists():
+            sys.exit(
+                f'Нет базовой линии {args.baseline}, '
+                f'сначала запустите с --save.'
+            )
+        saved = json.loads(args.baseline.read_text())
+        if saved['scale'] != scale:
+            sys.exit(
+                f'Базовая линия снята на данных {saved["scale"]}, '
+                f'а не {scale}.'
+            )
+        baseline = saved['routes']
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'db.sqlite3'))
+        missing = uncovered_routes()
+        if missing:
+            sys.exit(f'Нет замеров для маршрутов: {", ".join(missing)}')
+        dataset = create_dataset(args.notes, args.users)
+        results = measure(ROUTES, dataset, args.repeat)
+    print_results(results, baseline)
+    if args.save:
+        args.baseline.write_text(json.dumps(
+            {'scale': scale, 'routes': results}, ensure_ascii=False, indent=2
+        ) + '\n')
+        print(f'Базовая линия сохранена в {args.baseline}')
+        return
+    regressions = compare(
+        results, baseline, args.tolerance, args.memory_tolerance
+    )
+    for regression in regressions:
+        print(f'Регрессия: {regression}')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
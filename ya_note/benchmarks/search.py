@@ -0,0 +1,96 @@
+"""
+Время поиска по заметкам на большом корпусе.
+
+Данные создаются во временной базе. Запуск из каталога ya_note:
+
+    python -m benchmarks.search --notes 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from itertools import accumulate
+
+from benchmarks.notes_list import BATCH_SIZE, setup_django
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+VOCABULARY_SIZE = 20_000
+REPEAT = 20
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=100)
+    return parser.parse_args()
+
+
+def make_vocabulary(rng):
+    """
+    Словарь и накопленные веса слов по закону Ципфа, как в обычных текстах.
+    """
+    words = [
+        ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+    weights = list(accumulate(
+        1 / rank for rank in range(1, VOCABULARY_SIZE + 1)
+    ))
+    return words, weights
+
+
+def create_corpus(users, count, rng, words, weights):
+    from notes.models import Note
+    for start in range(0, count, BATCH_SIZE):
+        Note.objects.bulk_create(
+            Note(
+                title=' '.join(rng.choices(words, cum_weights=weights, k=3)),
+                text=' '.join(rng.choices(words, cum_weights=weights, k=30)),
+                author=users[index % len(users)],
+                slug=f'note-{index}',
+            )
+            for index in range(start, min(start + BATCH_SIZE, count))
+        )
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, 'db.sqlite3'))
+        from django.contrib.auth import get_user_model
+
+        from notes.search import search_notes
+        get_user_model().objects.bulk_create(
+            get_user_model()(username=f'user{index}')
+            for index in range(args.users)
+        )
+        users = list(get_user_model().objects.all())
+        rng = random.Random(0)
+        words, weights = make_vocabulary(rng)
+        started = time.perf_counter()
+        create_corpus(users, args.notes, rng, words, weights)
+        print(
+            f'Создано {args.notes} заметок за '
+            f'{time.perf_counter() - started:.1f} с'
+        )
+        author = users[0]
+        queries = (
+            words[0], words[100], words[5000], f'{words[1]} {words[50]}',
+            words[10][:3], 'нетакогослова',
+        )
+        for query in queries:
+            timings = []
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                found = search_notes(author, query, 50)
+                timings.append(time.perf_counter() - started)
+            print(
+                f'«{query}»: найдено {len(found)}, '
+                f'медиана {statistics.median(timings) * 1000:.2f} мс'
+            )
+
+
+if __name__ == '__main__':
+    main()
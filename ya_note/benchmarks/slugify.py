@@ -0,0 +1,51 @@
+"""
+Сравнение slugify из pytils и кешированного slugify заметок.
+
+Запуск из каталога ya_note:
+
+    python -m benchmarks.slugify
+"""
+import random
+import timeit
+
+from pytils.translit import slugify
+
+from notes.slugs import cached_slugify, slugify_many
+
+WORDS = (
+    'заметка', 'список', 'покупок', 'встреча', 'отчёт', 'идея', 'проект',
+    'план', 'неделя', 'работа', 'дом', 'книги', 'фильмы', 'задачи',
+)
+TITLES_COUNT = 100_000
+UNIQUE_TITLES = 2_000
+REPEAT = 3
+
+
+def make_titles(rng):
+    """Заголовки с повторами, как при массовом импорте заметок."""
+    unique = [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        for _ in range(UNIQUE_TITLES)
+    ]
+    return [rng.choice(unique) for _ in range(TITLES_COUNT)]
+
+
+def main():
+    titles = make_titles(random.Random(0))
+    assert slugify_many(titles) == [slugify(title) for title in titles]
+    cases = (
+        ('pytils', lambda: [slugify(title) for title in titles]),
+        ('кеш, по одному', lambda: [cached_slugify(t) for t in titles]),
+        ('кеш, пакетом', lambda: slugify_many(titles)),
+    )
+    print(f'{TITLES_COUNT} заголовков, уникальных {UNIQUE_TITLES}')
+    for name, case in cases:
+        seconds = min(timeit.repeat(
+            case, setup=cached_slugify.cache_clear, number=1, repeat=REPEAT
+        ))
+        print(f'{name}: {seconds * 1000:.0f} мс')
+    print(cached_slugify.cache_info())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from yanote.sqlite3.base import write_atomic
+
+from .forms import WARNING, NoteBatchForm
+from .models import Note
+from .slugs import allocate_slugs
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = ('id', 'title', 'text', 'slug')
+UPDATE_FIELDS = ('title', 'text', 'updated')
+NOT_FOUND = ' - такой заметки нет.'
+DUPLICATE = ' - slug повторяется в пакете.'
+TOO_MANY = 'Слишком много операций в пакете, максимум {limit}.'
+NOT_A_LIST = 'Ожидается список.'
+NOT_AN_OBJECT = 'Ожидается объект.'
+
+
+def get_list(payload, key):
+    items = payload.get(key, [])
+    if not isinstance(items, list):
+        raise ValidationError({key: NOT_A_LIST})
+    return items
+
+
+def clean_items(items, key, form_class=NoteBatchForm):
+    """Проверенные данные каждой заметки пакета."""
+    cleaned, errors = [], {}
+    for index, item in enumerate(items):
+        form = form_class(data=item if isinstance(item, dict) else {})
+        if form.is_valid():
+            cleaned.append(form.cleaned_data)
+        else:
+            errors[f'{key}.{index}'] = [
+                f'{field}: {error}'
+                for field, field_errors in form.errors.items()
+                for error in field_errors
+            ]
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+def check_duplicates(slugs, key):
+    seen = set()
+    for slug in slugs:
+        if slug in seen:
+            raise ValidationError({key: slug + DUPLICATE})
+        seen.add(slug)
+
+
+def apply_batch(author, payload):
+    """
+    Создание, изменение и удаление заметок автора одной транзакцией.
+
+    payload — словарь со списками delete (slug), update (slug
+    существующей заметки, новые title и text) и create (title, text,
+    необязательный slug); операции выполняются в этом порядке.
+    Заметки ищутся и сохраняются пачками, slug для новых заметок
+    подбираются все вместе. При любой ошибке ничего не сохраняется,
+    ошибки выбрасываются как ValidationError.
+    """
+    if not isinstance(payload, dict):
+        raise ValidationError(NOT_AN_OBJECT)
+    create, update, delete = (
+        get_list(payload, key) for key in ('create', 'update', 'delete')
+    )
+    limit = settings.NOTES_BATCH_LIMIT
+    if len(create) + len(update) + len(delete) > limit:
+        raise ValidationError(TOO_MANY.format(limit=limit))
+    create = clean_items(create, 'create')
+    update = clean_items(update, 'update')
+    delete = [str(slug) for slug in delete]
+    explicit = [data['slug'] for data in create if data['slug']]
+    check_duplicates(explicit, 'create')
+    check_duplicates([data['slug'] for data in update], 'update')
+    max_slug_length = Note._meta.get_field('slug').max_length
+    with write_atomic():
+        own = Note.objects.filter(author=author)
+        deleted, _ = own.filter(slug__in=delete).delete()
+        busy = set(
+            Note.objects.filter(slug__in=explicit)
+            .values_list('slug', flat=True)
+        )
+        if busy:
+            raise ValidationError(
+                {'create': [slug + WARNING for slug in sorted(busy)]}
+            )
+        notes = own.in_bulk(
+            [data['slug'] for data in update], field_name='slug'
+        )
+        missing = [data['slug'] for data in update
+                   if data['slug'] not in notes]
+        if missing:
+            raise ValidationError(
+                {'update': [slug + NOT_FOUND for slug in missing]}
+            )
+        now = timezone.now()
+        for data in update:
+            note = notes[data['slug']]
+            note.title = data['title']
+            note.text = data['text']
+            # bulk_update не обновляет поля с auto_now.
+            note.updated = now
+        Note.objects.bulk_update(notes.values(), UPDATE_FIELDS)
+        generated = iter(allocate_slugs(
+            Note.objects.all(),
+            [data['title'] for data in create if not data['slug']],
+            max_slug_length,
+            reserved=explicit
+        ))
+        created = [
+            Note(
+                author=author,
+                title=data['title'],
+                text=data['text'],
+                slug=data['slug'] or next(generated)
+            )
+            for data in create
+        ]
+        Note.objects.bulk_create(created)
+    return {
+        'created': [note.slug for note in created],
+        'updated': [data['slug'] for data in update],
+        'deleted': deleted,
+    }
+
+
+def export_notes(author):
+    """Заметки автора по возрастанию id, без загрузки всех в память."""
+    return (
+        Note.objects.filter(author=author)
+        .order_by('id')
+        .values(*EXPORT_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
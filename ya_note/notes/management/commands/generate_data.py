@@ -0,0 +1,72 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.models import Note
+from notes.synthetic import (
+    BATCH_SIZE, generate, load_snapshot, save_snapshot, snapshot_name
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями и заметками. '
+        'Данные зависят только от параметров и --seed; с --snapshot-dir '
+        'готовая база берётся из снимка SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько записей сохранять в одной транзакции.'
+        )
+        parser.add_argument(
+            '--snapshot-dir',
+            help=(
+                'Каталог снимков: если снимок с такими параметрами есть, '
+                'база восстанавливается из него, иначе сохраняется после '
+                'генерации. Работает только с пустой базой SQLite.'
+            )
+        )
+
+    def handle(self, *args, users, notes, seed, batch_size, snapshot_dir,
+               **options):
+        if notes and not users:
+            raise CommandError('Для заметок нужен --users больше нуля.')
+        snapshot = None
+        if snapshot_dir:
+            if Note.objects.exists():
+                raise CommandError(
+                    'Снимок заменяет базу целиком, а в ней уже есть данные.'
+                )
+            snapshot = os.path.join(snapshot_dir, snapshot_name(
+                users=users, notes=notes, seed=seed
+            ))
+            if os.path.exists(snapshot):
+                load_snapshot(snapshot)
+                self.stdout.write(self.style.SUCCESS(
+                    f'База восстановлена из снимка {snapshot}'
+                ))
+                return
+        started = time.monotonic()
+
+        def progress(model, saved):
+            rate = saved / (time.monotonic() - started)
+            self.stdout.write(
+                f'{model._meta.label}: {saved} '
+                f'({rate:.0f} в секунду)'
+            )
+
+        generate(users, notes, seed, batch_size, progress)
+        if snapshot:
+            save_snapshot(snapshot)
+            self.stdout.write(f'Снимок сохранён в {snapshot}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:30
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# SQLite добавляет поле, пересоздавая таблицу, и теряет триггеры
+# полнотекстового индекса: индекс удаляется и строится заново.
+note_fts = import_module('notes.migrations.0003_note_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(note_fts.drop_fts, note_fts.create_fts),
+        migrations.AddField(
+            model_name='note',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменена'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'updated'], name='note_author_updated_idx'),
+        ),
+        migrations.RunPython(note_fts.create_fts, note_fts.drop_fts),
+    ]
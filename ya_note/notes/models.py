@@ -1,7 +1,9 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .slugs import slug_candidates
+
+SLUG_ATTEMPTS = 5
 
 
 class Note(models.Model):
@@ -27,12 +29,39 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated = models.DateTimeField('Изменена', auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+            models.Index(
+                fields=('author', 'updated'), name='note_author_updated_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Если slug не указан, он строится по заголовку с числовым
+        суффиксом при совпадении. Если такой slug успели занять
+        параллельно, сохранение повторяется со следующим вариантом.
+        """
+        if self.slug:
+            super().save(*args, **kwargs)
+            return
+        max_slug_length = self._meta.get_field('slug').max_length
+        candidates = slug_candidates(
+            Note.objects.exclude(pk=self.pk), self.title, max_slug_length
+        )
+        for attempt in range(1, SLUG_ATTEMPTS + 1):
+            self.slug = next(candidates)
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_ATTEMPTS:
+                    raise
@@ -0,0 +1,66 @@
+import re
+
+from django.db import OperationalError, connection
+from django.db.models import Q
+
+from yanote.sqlite3.base import table_exists
+
+from .models import Note
+
+TOKEN_RE = re.compile(r'\w+')
+FTS_TABLE = 'notes_note_fts'
+# Начало сообщения SQLite о запросе, который FTS5 не смог разобрать.
+FTS_SYNTAX_ERROR = 'fts5: syntax error'
+FTS_SQL = (
+    'SELECT rowid FROM notes_note_fts WHERE notes_note_fts MATCH %s '
+    'ORDER BY rank LIMIT %s'
+)
+
+
+def fts_available():
+    return (
+        connection.vendor == 'sqlite'
+        and table_exists(FTS_TABLE)
+    )
+
+
+def fts_query(author_id, tokens):
+    """
+    Все слова запроса обязательны, последнее ищется по префиксу.
+
+    Автор тоже ищется по индексу, поэтому ранжируются только его заметки.
+    """
+    phrases = [f'"{token}"' for token in tokens]
+    phrases[-1] += '*'
+    return f'author_id:"{author_id}" AND {{title text}}:({" ".join(phrases)})'
+
+
+def search_notes(author, query, limit):
+    """
+    Заметки автора, в заголовке или тексте которых есть все слова запроса.
+
+    В SQLite поиск идёт по индексу FTS5, результаты упорядочены
+    по релевантности. На других базах и без FTS5 — поиск по вхождению
+    подстроки, новые заметки первыми. Запрос, который FTS5 не разобрал,
+    ничего не находит.
+    """
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return []
+    if fts_available():
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(FTS_SQL, [fts_query(author.pk, tokens), limit])
+                ids = [row[0] for row in cursor.fetchall()]
+        except OperationalError as error:
+            if not str(error).startswith(FTS_SYNTAX_ERROR):
+                raise
+            return []
+        notes = Note.objects.filter(author=author).in_bulk(ids)
+        return [notes[pk] for pk in ids if pk in notes]
+    notes = Note.objects.filter(author=author)
+    for token in tokens:
+        notes = notes.filter(
+            Q(title__icontains=token) | Q(text__icontains=token)
+        )
+    return list(notes.order_by('-id')[:limit])
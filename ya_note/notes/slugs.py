@@ -0,0 +1,133 @@
+import re
+from functools import lru_cache
+
+from django.db.models import Q
+from pytils.translit import slugify
+
+SLUGIFY_CACHE_SIZE = 4096
+TAKEN_CHUNK_SIZE = 200
+SUFFIX_RE = re.compile(r'-(\d+)\Z')
+# Место под суффикс вида -<число>: у длинных основ варианты с суффиксом
+# обрезаются, поэтому занятые варианты ищутся по укороченной основе.
+SUFFIX_RESERVE = len('-999999999')
+# Slug заголовка без букв и цифр, который транслитерируется в ''.
+DEFAULT_SLUG = 'note'
+# Символ, следующий в таблице кодов за дефисом: все slug вида base
+# и base-<что угодно> лежат в диапазоне [base, base + '.').
+AFTER_HYPHEN = '.'
+# Наибольший символ Unicode: все slug, начинающиеся с stem, лежат
+# в диапазоне [stem, stem + MAX_CHAR). В отличие от LIKE 'stem%'
+# диапазон обслуживается индексом.
+MAX_CHAR = '\U0010ffff'
+
+
+@lru_cache(maxsize=SLUGIFY_CACHE_SIZE)
+def cached_slugify(title):
+    """
+    slugify из pytils с кешем последних заголовков.
+
+    Счётчики попаданий и промахов доступны через cached_slugify.cache_info().
+    """
+    return slugify(title)
+
+
+def slugify_many(titles):
+    """Slug для каждого заголовка; повторы транслитерируются один раз."""
+    slugs = {title: cached_slugify(title) for title in set(titles)}
+    return [slugs[title] for title in titles]
+
+
+def make_base(slug, max_length):
+    """Основа slug заголовка: обрезанная до max_length и не пустая."""
+    return slug[:max_length] or DEFAULT_SLUG
+
+
+def with_suffix(base, number, max_length):
+    """Вариант base-number; основа обрезается, чтобы суффикс поместился."""
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)] + suffix
+
+
+def taken_slugs(queryset, bases, max_length):
+    """
+    Занятые slug вида base и base-<что угодно> для всех bases сразу.
+
+    Каждая основа — диапазон значений уникального индекса на slug,
+    диапазоны объединяются по TAKEN_CHUNK_SIZE штук в один запрос.
+    Для длинной основы, у которой варианты с суффиксом обрезаются,
+    диапазон охватывает все slug, начинающиеся с укороченной основы.
+    """
+    bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(bases), TAKEN_CHUNK_SIZE):
+        ranges = Q()
+        for base in bases[start:start + TAKEN_CHUNK_SIZE]:
+            stem = base[:max_length - SUFFIX_RESERVE]
+            if stem == base:
+                ranges |= Q(slug__gte=base, slug__lt=base + AFTER_HYPHEN)
+            else:
+                ranges |= Q(slug__gte=stem, slug__lt=stem + MAX_CHAR)
+        taken.update(queryset.filter(ranges).values_list('slug', flat=True))
+    return taken
+
+
+def free_slugs(base, taken, max_length):
+    """
+    Свободные варианты slug: base, base-2, base-3, ...
+
+    Множество taken проверяется в момент выдачи очередного варианта,
+    поэтому в него можно добавлять slug, занятые уже после создания
+    генератора. Генератор бесконечен.
+    """
+    if base not in taken:
+        yield base
+    stem = base[:max_length - SUFFIX_RESERVE]
+    numbers = [
+        number for number in (
+            int(match.group(1)) for match in (
+                SUFFIX_RE.search(slug) for slug in taken
+                if slug.startswith(stem)
+            ) if match
+        ) if with_suffix(base, number, max_length) in taken
+    ]
+    number = max(numbers, default=1)
+    while True:
+        number += 1
+        candidate = with_suffix(base, number, max_length)
+        if candidate not in taken:
+            yield candidate
+
+
+def slug_candidates(queryset, title, max_length):
+    """
+    Свободные варианты slug для заголовка: base, base-2, base-3, ...
+
+    Занятые варианты выбираются одним запросом по диапазону значений,
+    который обслуживается уникальным индексом на slug. Генератор
+    бесконечен: если вариант успели занять, берётся следующий.
+    """
+    base = make_base(cached_slugify(title), max_length)
+    return free_slugs(
+        base, taken_slugs(queryset, [base], max_length), max_length
+    )
+
+
+def allocate_slugs(queryset, titles, max_length, reserved=()):
+    """
+    Уникальные slug для списка заголовков за один проход.
+
+    Занятые варианты всех заголовков выбираются вместе, повторяющиеся
+    заголовки получают последовательные суффиксы. Slug из reserved
+    считаются занятыми — так учитываются slug, указанные явно.
+    """
+    bases = [make_base(slug, max_length) for slug in slugify_many(titles)]
+    taken = taken_slugs(queryset, bases, max_length) | set(reserved)
+    candidates = {}
+    slugs = []
+    for base in bases:
+        if base not in candidates:
+            candidates[base] = free_slugs(base, taken, max_length)
+        slug = next(candidates[base])
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
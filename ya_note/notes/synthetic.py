@@ -0,0 +1,239 @@
+"""
+Синтетические пользователи и заметки для нагрузочных тестов
+и бенчмарков.
+
+Данные детерминированы: одинаковые параметры и seed дают одинаковую
+базу. Объекты создаются генераторами и пишутся порциями через
+bulk_create, поэтому расход памяти не зависит от объёма данных.
+Готовую базу можно сохранить снимком SQLite и потом восстанавливать
+вместо повторной генерации.
+"""
+import hashlib
+import json
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Max
+from django.utils import timezone
+from pytils.translit import slugify
+
+from .models import Note
+
+# Меняется вместе с алгоритмом генерации, чтобы старые снимки
+# не восстанавливались вместо новых данных.
+GENERATOR_VERSION = 1
+BATCH_SIZE = 5000
+ALPHABET_CONSONANTS = 'бвгдзклмнпрстфхцчшщ'
+ALPHABET_VOWELS = 'аеиоуыэюя'
+VOCABULARY_SIZE = 20_000
+END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DAYS = 3 * 365
+# Доля заметок у первого процента авторов — 0.01 ** (1 / AUTHOR_SKEW):
+# 1% пользователей пишет около пятой части всех заметок.
+AUTHOR_SKEW = 3
+# Медиана длины заметки — около 40 слов.
+NOTE_WORDS = (3.7, 1)
+MAX_WORDS = 2000
+
+User = get_user_model()
+
+
+def make_vocabulary(rng):
+    """
+    Слова из кириллических слогов и накопленные веса по закону Ципфа,
+    как в обычных текстах.
+    """
+    words = [
+        ''.join(
+            rng.choice(ALPHABET_CONSONANTS) + rng.choice(ALPHABET_VOWELS)
+            for _ in range(rng.randint(1, 4))
+        )
+        for _ in range(VOCABULARY_SIZE)
+    ]
+    weights = list(accumulate(
+        1 / rank for rank in range(1, VOCABULARY_SIZE + 1)
+    ))
+    return words, weights
+
+
+def make_words(rng, vocabulary, count):
+    words, weights = vocabulary
+    return rng.choices(words, cum_weights=weights, k=count)
+
+
+def make_text(rng, vocabulary, length):
+    """Текст из предложений по 5–15 слов, длина — логнормальная."""
+    count = min(max(int(rng.lognormvariate(*length)), 1), MAX_WORDS)
+    words = make_words(rng, vocabulary, count)
+    sentences = []
+    start = 0
+    while start < count:
+        end = start + rng.randint(5, 15)
+        sentences.append(' '.join(words[start:end]).capitalize() + '.')
+        start = end
+    return ' '.join(sentences)
+
+
+def make_title(rng, vocabulary, max_length):
+    title = ' '.join(make_words(rng, vocabulary, rng.randint(2, 6)))
+    return title[:max_length].strip().capitalize()
+
+
+def skewed_index(rng, count, skew):
+    """
+    Номер от 0 до count - 1, малые номера выпадают чаще.
+
+    Степенное распределение без таблицы весов: память не зависит
+    от count.
+    """
+    return int(count * rng.random() ** skew)
+
+
+def make_slug(title, pk, max_length):
+    """Slug по заголовку; суффикс с pk делает его уникальным."""
+    suffix = f'-{pk}'
+    return slugify(title)[:max_length - len(suffix)] + suffix
+
+
+def first_pk(model):
+    return (model.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+
+def generate_users(start, count):
+    joined = END - timedelta(days=DAYS)
+    for index in range(count):
+        yield User(
+            pk=start + index,
+            username=f'user{start + index}',
+            password=UNUSABLE_PASSWORD_PREFIX,
+            date_joined=joined + timedelta(minutes=index),
+        )
+
+
+def generate_notes(rng, vocabulary, start, count, users):
+    """
+    Заметки пользователей users = (первый pk, число).
+
+    Большую часть заметок пишет небольшая доля активных авторов.
+    """
+    users_start, users_count = users
+    title_length = Note._meta.get_field('title').max_length
+    slug_length = Note._meta.get_field('slug').max_length
+    for index in range(count):
+        title = make_title(rng, vocabulary, title_length)
+        yield Note(
+            pk=start + index,
+            title=title,
+            text=make_text(rng, vocabulary, NOTE_WORDS),
+            slug=make_slug(title, start + index, slug_length),
+            author_id=users_start + skewed_index(
+                rng, users_count, AUTHOR_SKEW
+            ),
+            updated=END - timedelta(seconds=rng.uniform(0, DAYS * 86400)),
+        )
+
+
+def write(model, objects, batch_size=BATCH_SIZE, progress=None, keep=()):
+    """
+    Сохраняет объекты порциями по batch_size, каждую — своей транзакцией.
+
+    Поля keep с auto_now bulk_create заполняет текущим временем, поэтому
+    их переданные значения записываются следом через bulk_update.
+    progress(model, saved) вызывается после каждой порции.
+    """
+    saved = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return saved
+        kept = [[getattr(obj, name) for name in keep] for obj in batch]
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+            if keep:
+                for obj, values in zip(batch, kept):
+                    for name, value in zip(keep, values):
+                        setattr(obj, name, value)
+                model.objects.bulk_update(batch, keep)
+        saved += len(batch)
+        if progress:
+            progress(model, saved)
+
+
+def generate(users, notes, seed=0, batch_size=BATCH_SIZE, progress=None):
+    """Создаёт users пользователей и notes заметок."""
+    if notes and not users:
+        raise ValueError('Для заметок нужны новые пользователи.')
+    vocabulary = make_vocabulary(random.Random(f'{seed}-vocabulary'))
+    users_start = first_pk(User)
+    notes_start = first_pk(Note)
+    write(User, generate_users(users_start, users), batch_size, progress)
+    write(
+        Note,
+        generate_notes(
+            random.Random(f'{seed}-notes'), vocabulary, notes_start,
+            notes, (users_start, users)
+        ),
+        batch_size, progress, keep=('updated',)
+    )
+    reset_sequences()
+
+
+def reset_sequences():
+    """После вставки с явными pk обновляем счётчики первичных ключей."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [User, Note])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def snapshot_name(**params):
+    """
+    Имя файла снимка для параметров генерации.
+
+    В имя входят версия генератора и последние миграции, так что после
+    изменения схемы старый снимок не подойдёт.
+    """
+    migrations = sorted(
+        MigrationLoader(connection, ignore_no_migrations=True)
+        .graph.leaf_nodes()
+    )
+    key = json.dumps(
+        [GENERATOR_VERSION, migrations, sorted(params.items())]
+    )
+    return f'{hashlib.md5(key.encode()).hexdigest()}.sqlite3'
+
+
+def raw_connection():
+    if connection.vendor != 'sqlite':
+        raise ValueError('Снимки поддерживаются только для SQLite.')
+    connection.ensure_connection()
+    return connection.connection
+
+
+def save_snapshot(path):
+    """Копирует текущую базу в файл снимка."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.tmp'
+    target = sqlite3.connect(temporary)
+    try:
+        raw_connection().backup(target)
+    finally:
+        target.close()
+    os.replace(temporary, path)
+
+
+def load_snapshot(path):
+    """Заменяет содержимое текущей базы содержимым снимка."""
+    source = sqlite3.connect(path)
+    try:
+        source.backup(raw_connection())
+    finally:
+        source.close()
@@ -0,0 +1,52 @@
+import os
+from unittest import skipUnless
+
+from django.test import SimpleTestCase, TestCase
+
+from benchmarks.routes import (
+    ROUTES, compare, create_dataset, measure, uncovered_routes
+)
+
+BASELINE = {'home': {'p50': 10, 'queries': 2, 'memory': 1000}}
+
+
+class TestCompare(SimpleTestCase):
+
+    def test_benchmark_covers_all_routes(self):
+        """Для каждого именованного маршрута есть замер."""
+        self.assertEqual(uncovered_routes(), [])
+
+    def test_compare(self):
+        """Регрессия — рост запросов, времени или памяти сверх допуска."""
+        cases = (
+            ({'p50': 12, 'queries': 2, 'memory': 1050}, 0),
+            ({'p50': 10, 'queries': 1, 'memory': 500}, 0),
+            ({'p50': 10, 'queries': 3, 'memory': 1000}, 1),
+            ({'p50': 13, 'queries': 2, 'memory': 1000}, 1),
+            ({'p50': 10, 'queries': 2, 'memory': 1200}, 1),
+        )
+        for result, regressions in cases:
+            with self.subTest(result=result):
+                self.assertEqual(
+                    len(compare({'home': result}, BASELINE, 0.25, 0.1)),
+                    regressions
+                )
+
+    def test_compare_ignores_small_slowdown(self):
+        """Замедление меньше миллисекунды не считается регрессией."""
+        baseline = {'home': {'p50': 1, 'queries': 1, 'memory': 1000}}
+        result = {'p50': 1.5, 'queries': 1, 'memory': 1000}
+        self.assertEqual(compare({'home': result}, baseline, 0.25, 0.1), [])
+
+
+@skipUnless(
+    os.getenv('YANOTE_BENCHMARK_TESTS'),
+    'Полный замер маршрутов запускается с YANOTE_BENCHMARK_TESTS=1.'
+)
+class TestMeasure(TestCase):
+
+    def test_measure_all_routes(self):
+        """Все маршруты отвечают без ошибок на синтетических данных."""
+        results = measure(ROUTES, create_dataset(20, 2), repeat=2)
+        self.assertEqual(set(results), {route.label for route in ROUTES})
+        self.assertGreater(results['list']['queries'], 0)
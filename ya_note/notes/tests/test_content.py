@@ -1,12 +1,19 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import OperationalError, connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from notes.forms import NoteForm
 from notes.models import Note
+from notes.search import search_notes
 
 User = get_user_model()
-NOTES_COUNT_ON_LIST_PAGE = 10
+NOTES_COUNT_ON_LIST_PAGE = settings.NOTES_COUNT_ON_LIST_PAGE
 
 
 class TestListPage(TestCase):
@@ -61,3 +68,224 @@ class TestListPage(TestCase):
                 note_in_object_list = self.notes in response.context[
                     'object_list']
                 self.assertEqual(note_in_object_list, value)
+
+
+class TestListPagination(TestCase):
+    LIST_URL = reverse('notes:list')
+    NOTES_COUNT = NOTES_COUNT_ON_LIST_PAGE * 2 + 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Читатель')
+        cls.other = User.objects.create(username='Другой')
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text='Текст',
+                author=cls.author if index % 2 else cls.other,
+                slug=f'note-{index}',
+            )
+            for index in range(cls.NOTES_COUNT * 2)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_notes_list_pages(self):
+        """
+        Заметки выводятся порциями по возрастанию id, страницы
+        по курсору не теряют и не повторяют заметки.
+        """
+        response = self.client.get(self.LIST_URL)
+        shown = list(response.context['object_list'])
+        self.assertEqual(len(shown), NOTES_COUNT_ON_LIST_PAGE)
+        cursor = response.context['next_cursor']
+        while cursor:
+            # Сессия, пользователь, маркер для ETag и страница заметок.
+            with self.assertNumQueries(4):
+                response = self.client.get(self.LIST_URL, {'after': cursor})
+            shown += response.context['object_list']
+            cursor = response.context['next_cursor']
+        expected = list(Note.objects.filter(author=self.author).order_by('id'))
+        self.assertEqual(shown, expected)
+
+    def test_notes_list_does_not_load_text(self):
+        """Текст заметок для списка не выбирается из базы."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.LIST_URL)
+        list_query = queries[-1]['sql']
+        self.assertIn('ORDER BY "notes_note"."id"', list_query)
+        self.assertNotIn('"notes_note"."text"', list_query)
+
+    def test_notes_list_bad_cursor(self):
+        """Некорректный курсор приводит к ошибке 400."""
+        response = self.client.get(self.LIST_URL, {'after': 'abc'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+class TestSearch(TestCase):
+    SEARCH_URL = reverse('notes:search')
+    SEARCH_API_URL = reverse('notes:search_api')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.other = User.objects.create(username='Другой')
+        cls.recipe = Note.objects.create(
+            title='Рецепт пирога', text='Мука, яблоки, сахар.',
+            author=cls.author, slug='recipe',
+        )
+        cls.shopping = Note.objects.create(
+            title='Покупки', text='Купить яблоки и молоко.',
+            author=cls.author, slug='shopping',
+        )
+        cls.foreign = Note.objects.create(
+            title='Яблоки', text='Чужая заметка про яблоки.',
+            author=cls.other, slug='foreign',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def search(self, query):
+        response = self.client.get(self.SEARCH_URL, {'q': query})
+        return set(response.context['object_list'])
+
+    def test_search_own_notes(self):
+        """Поиск находит только свои заметки по заголовку и тексту."""
+        cases = (
+            ('яблоки', {self.recipe, self.shopping}),
+            ('ЯБЛОКИ молоко', {self.shopping}),
+            ('пирог', {self.recipe}),
+            ('чужая', set()),
+            ('', set()),
+        )
+        for query, expected in cases:
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), expected)
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении заметки."""
+        self.shopping.text = 'Купить хлеб.'
+        self.shopping.save()
+        self.assertEqual(self.search('молоко'), set())
+        self.assertEqual(self.search('хлеб'), {self.shopping})
+        self.shopping.delete()
+        self.assertEqual(self.search('хлеб'), set())
+
+    def test_search_fallback(self):
+        """Без индекса поиск работает через вхождение подстроки."""
+        with mock.patch('notes.search.fts_available', return_value=False):
+            self.assertEqual(self.search('яблоки молоко'), {self.shopping})
+
+    def test_search_fts_errors(self):
+        """
+        Запрос, который FTS5 не разобрал, ничего не находит, остальные
+        ошибки базы не скрываются поиском по подстроке.
+        """
+        with mock.patch('notes.search.fts_query', return_value='яблоки AND'):
+            self.assertEqual(search_notes(self.author, 'яблоки', 10), [])
+        with mock.patch(
+            'notes.search.FTS_SQL', 'SELECT id FROM missing WHERE %s AND %s'
+        ), self.assertRaisesMessage(OperationalError, 'no such table'):
+            search_notes(self.author, 'яблоки', 10)
+
+    def test_search_api(self):
+        """API поиска возвращает найденные заметки в JSON."""
+        response = self.client.get(self.SEARCH_API_URL, {'q': 'пирог'})
+        self.assertEqual(response.json(), {
+            'query': 'пирог',
+            'results': [{
+                'id': self.recipe.pk,
+                'title': self.recipe.title,
+                'slug': self.recipe.slug,
+            }],
+        })
+
+
+class TestConditionalGet(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Санта-Клаус')
+        cls.not_author = User.objects.create(username='Кто-то')
+        cls.list_url = reverse('notes:list')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+        self.note = Note.objects.create(
+            title='Заголовок', text='Текст', author=self.author
+        )
+        self.detail_url = reverse('notes:detail', args=(self.note.slug,))
+
+    def revalidate(self, url, response, client=None):
+        return (client or self.client).get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+
+    def test_not_modified(self):
+        """Неизменившиеся заметка и список отдаются ответом 304."""
+        for url in (self.detail_url, self.list_url):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                # Сессия, пользователь и маркер изменений.
+                with self.assertNumQueries(3):
+                    repeated = self.revalidate(url, response)
+                self.assertEqual(repeated.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+                self.assertEqual(repeated.content, b'')
+
+    def test_detail_last_modified(self):
+        response = self.client.get(self.detail_url)
+        repeated = self.client.get(
+            self.detail_url,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(repeated.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_changes_reset_etag(self):
+        """После изменений заметок страница отдаётся заново."""
+        changes = (
+            lambda: self.client.post(
+                reverse('notes:edit', args=(self.note.slug,)),
+                data={'title': 'Новый', 'text': 'Текст',
+                      'slug': self.note.slug}
+            ),
+            lambda: Note.objects.create(
+                title='Вторая', text='Текст', author=self.author
+            ),
+            lambda: Note.objects.filter(title='Вторая').delete(),
+        )
+        for change in changes:
+            with self.subTest(change=change):
+                response = self.client.get(self.list_url)
+                change()
+                repeated = self.revalidate(self.list_url, response)
+                self.assertEqual(repeated.status_code, HTTPStatus.OK)
+        response = self.client.get(self.detail_url)
+        self.note.save()
+        repeated = self.revalidate(self.detail_url, response)
+        self.assertEqual(repeated.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_user(self):
+        """ETag одного пользователя не подходит другому."""
+        Note.objects.create(
+            title='Чужая', text='Текст', author=self.not_author
+        )
+        response = self.client.get(self.list_url)
+        client = Client()
+        client.force_login(self.not_author)
+        repeated = self.revalidate(self.list_url, response, client)
+        self.assertEqual(repeated.status_code, HTTPStatus.OK)
+        self.assertNotEqual(repeated['ETag'], response['ETag'])
+
+    def test_etag_depends_on_version(self):
+        """После смены NOTES_ETAG_VERSION страницы отдаются заново."""
+        for url in (self.detail_url, self.list_url):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                with override_settings(NOTES_ETAG_VERSION='new'):
+                    repeated = self.revalidate(url, response)
+                self.assertEqual(repeated.status_code, HTTPStatus.OK)
+                self.assertNotEqual(repeated['ETag'], response['ETag'])
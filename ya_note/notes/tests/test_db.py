@@ -0,0 +1,71 @@
+import os
+import sqlite3
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from notes.models import Note
+from yanote.sqlite3.base import table_exists, write_atomic
+
+
+class TestSqlitePragmas(TestCase):
+
+    def test_sqlite_pragmas(self):
+        """Настройки SQLITE_PRAGMAS применяются к соединению."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            # 1 — NORMAL.
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout']
+            )
+
+    def test_missing_table_is_checked_again(self):
+        """Отсутствие таблицы не запоминается, найденная — запоминается."""
+        self.assertFalse(table_exists('notes_late_table'))
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE notes_late_table (id integer)')
+        self.assertTrue(table_exists('notes_late_table'))
+        with self.assertNumQueries(0):
+            self.assertTrue(table_exists('notes_late_table'))
+
+
+class TestTestDatabaseSnapshot(TestCase):
+
+    def test_test_database_snapshot(self):
+        """Мигрированная тестовая база сохраняется снимком."""
+        snapshot = connection.creation.snapshot_path()
+        self.assertTrue(os.path.exists(snapshot))
+        restored = sqlite3.connect(snapshot)
+        tables = {
+            name for name, in restored.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        restored.close()
+        self.assertIn(Note._meta.db_table, tables)
+
+
+class TestSqliteTransactions(TransactionTestCase):
+
+    def test_transactions_begin_immediate(self):
+        """
+        Блокировку на запись сразу берут только транзакции write_atomic,
+        читающие транзакции начинаются с обычного BEGIN.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                Note.objects.count()
+            with write_atomic():
+                with write_atomic():
+                    Note.objects.count()
+            with transaction.atomic():
+                Note.objects.count()
+        begins = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('BEGIN')
+        ]
+        self.assertEqual(begins, ['BEGIN', 'BEGIN IMMEDIATE', 'BEGIN'])
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import logging
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+from yanote.instrumentation import InstrumentationMiddleware
+
+User = get_user_model()
+LOGGER = 'yanote.instrumentation'
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True, INSTRUMENTATION_N_PLUS_ONE=3)
+class TestInstrumentation(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', author=cls.author
+        )
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_request_metrics(self):
+        """Метрики запроса попадают в Server-Timing и в лог."""
+        with self.assertLogs(LOGGER, logging.INFO) as logs:
+            response = self.client.get(
+                reverse('notes:detail', args=(self.note.slug,))
+            )
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'notes:detail')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertEqual(len(logs.records), 1)
+
+    def test_n_plus_one_is_logged(self):
+        """Запрос автора для каждой заметки отмечается в логе."""
+        for index in range(3):
+            Note.objects.create(
+                title=f'Заметка {index}', text='Текст', author=self.author
+            )
+
+        def view(request):
+            return HttpResponse(', '.join(
+                note.author.username for note in Note.objects.all()
+            ))
+
+        with self.assertLogs(LOGGER, logging.WARNING) as logs:
+            InstrumentationMiddleware(view)(RequestFactory().get('/'))
+        repeated = json.loads(logs.records[0].getMessage())['repeated']
+        self.assertEqual(list(repeated.values()), [Note.objects.count()])
+
+    def test_async_request_metrics(self):
+        """
+        В асинхронной цепочке middleware остаётся асинхронным и считает
+        запросы, выполненные в потоке sync_to_async.
+        """
+        async def view(request):
+            count = await sync_to_async(Note.objects.count)()
+            return HttpResponse(str(count))
+
+        middleware = InstrumentationMiddleware(view)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        with self.assertLogs(LOGGER, logging.INFO):
+            response = async_to_sync(middleware)(RequestFactory().get('/'))
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+    @override_settings(INSTRUMENTATION_ENABLED=False)
+    def test_disabled_instrumentation(self):
+        """Выключенный middleware не участвует в обработке запросов."""
+        with self.assertRaises(MiddlewareNotUsed):
+            InstrumentationMiddleware(HttpResponse)
+        response = self.client.get(reverse('notes:list'))
+        self.assertNotIn('Server-Timing', response)
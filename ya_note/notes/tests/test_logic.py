@@ -1,12 +1,19 @@
+import json
 from http import HTTPStatus
+from unittest import mock, skipUnless
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import (
+    allocate_slugs, cached_slugify, slugify_many, taken_slugs
+)
 
 User = get_user_model()
 SUCCESS_URL = reverse('notes:success')
@@ -69,6 +76,44 @@ class TestNoteCreation(TestCase):
         expected_slug = slugify(self.form_data['title'])
         self.assertEqual(new_note.slug, expected_slug)
 
+    def test_empty_slug_gets_suffix_for_taken_title(self):
+        """
+        Если slug по заголовку занят, к нему добавляется числовой суффикс.
+        """
+        del self.form_data['slug']
+        expected_slug = slugify(self.form_data['title'])
+        for suffix in ('', '-2', '-3'):
+            with self.subTest(suffix=suffix):
+                response = self.auth_client.post(self.url, data=self.form_data)
+                self.assertRedirects(response, SUCCESS_URL)
+                new_note = Note.objects.last()
+                self.assertEqual(new_note.slug, expected_slug + suffix)
+
+    def test_empty_slug_queries(self):
+        """
+        Для подбора slug выполняется один запрос: сессия, пользователь,
+        подбор slug, точка сохранения, вставка, освобождение точки.
+        """
+        del self.form_data['slug']
+        with self.assertNumQueries(6):
+            self.auth_client.post(self.url, data=self.form_data)
+
+    def test_slug_retry_after_integrity_error(self):
+        """
+        Если подобранный slug заняли параллельно, заметка сохраняется
+        со следующим вариантом.
+        """
+        Note.objects.create(
+            title='Другая', text='Текст', author=self.author, slug='taken'
+        )
+        note = Note(title='Заголовок', text='Текст', author=self.author)
+        with mock.patch(
+            'notes.models.slug_candidates',
+            return_value=iter(('taken', 'free'))
+        ):
+            note.save()
+        self.assertEqual(note.slug, 'free')
+
 
 class TestNoteEditDelete(TestCase):
     NOTE_TEXT = 'Текст заметки.'
@@ -126,3 +171,214 @@ class TestNoteEditDelete(TestCase):
         self.assertEqual(self.notes.text, self.NOTE_TEXT)
         self.assertEqual(self.notes.title, self.NOTE_TITLE)
         self.assertEqual(self.notes.author, self.author)
+
+
+class TestSlugify(TestCase):
+
+    def setUp(self):
+        cached_slugify.cache_clear()
+
+    def test_cached_slugify_matches_pytils(self):
+        """Кешированный slugify совпадает с pytils и считает попадания."""
+        title = 'Новая заметка'
+        self.assertEqual(cached_slugify(title), slugify(title))
+        self.assertEqual(cached_slugify(title), slugify(title))
+        info = cached_slugify.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_slugify_many(self):
+        """Пакетный slugify сохраняет порядок и повторы заголовков."""
+        titles = ['Первая', 'Вторая', 'Первая']
+        self.assertEqual(
+            slugify_many(titles), [slugify(title) for title in titles]
+        )
+        self.assertEqual(cached_slugify.cache_info().misses, 2)
+
+    def test_allocate_slugs(self):
+        """Slug пакета не совпадают ни с базой, ни друг с другом."""
+        author = User.objects.create(username='Автор')
+        base = slugify('Заметка')
+        Note.objects.create(
+            title='Заметка', text='Текст', author=author
+        )
+        Note.objects.create(
+            title='Другая', text='Текст', author=author, slug=f'{base}-7'
+        )
+        slugs = allocate_slugs(
+            Note.objects.all(), ['Заметка', 'Другая', 'Заметка'], 100,
+            reserved=[f'{base}-8']
+        )
+        self.assertEqual(
+            slugs, [f'{base}-9', slugify('Другая'), f'{base}-10']
+        )
+
+    def test_long_title_slugs(self):
+        """
+        Заметки с длинным одинаковым заголовком получают обрезанные
+        slug с суффиксами без повторных попыток сохранения.
+        """
+        author = User.objects.create(username='Автор')
+        title = 'Щ' * 100
+        base = slugify(title)[:100]
+        with mock.patch('notes.models.SLUG_ATTEMPTS', 1):
+            notes = [
+                Note.objects.create(title=title, text='Текст', author=author)
+                for _ in range(8)
+            ]
+        self.assertEqual(
+            [note.slug for note in notes],
+            [base] + [f'{base[:98]}-{number}' for number in range(2, 9)]
+        )
+        self.assertEqual(
+            allocate_slugs(Note.objects.all(), [title, title], 100),
+            [f'{base[:98]}-9', f'{base[:97]}-10']
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'Проверяется план SQLite.')
+    def test_taken_slugs_use_index(self):
+        """
+        Занятые slug короткой и длинной основы выбираются одним запросом
+        по уникальному индексу, без сканирования таблицы.
+        """
+        bases = ['zametka', slugify('Щ' * 100)[:100]]
+        with CaptureQueriesContext(connection) as queries:
+            taken_slugs(Note.objects.all(), bases, 100)
+        self.assertEqual(len(queries), 1)
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + queries[0]['sql'])
+            plan = [row[-1] for row in cursor.fetchall()]
+        for step in plan:
+            self.assertFalse(step.startswith('SCAN'), plan)
+        self.assertIn('(slug>? AND slug<?)', ' | '.join(plan))
+
+    def test_empty_slug_has_default(self):
+        """Заголовок без букв и цифр получает slug по умолчанию."""
+        author = User.objects.create(username='Автор')
+        slugs = [
+            Note.objects.create(title='!!!', text='Текст', author=author).slug
+            for _ in range(2)
+        ]
+        self.assertEqual(slugs, ['note', 'note-2'])
+        self.assertEqual(
+            allocate_slugs(Note.objects.all(), ['?'], 100), ['note-3']
+        )
+
+
+class TestNoteBatch(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Санта-Клаус')
+        cls.not_author = User.objects.create(username='Кто-то')
+        cls.url = reverse('notes:batch_api')
+        cls.export_url = reverse('notes:export_api')
+
+    def setUp(self):
+        self.client.force_login(self.author)
+        self.note = Note.objects.create(
+            title='Старая', text='Текст', author=self.author, slug='old'
+        )
+
+    def post(self, payload):
+        return self.client.post(
+            self.url, data=payload, content_type='application/json'
+        )
+
+    def test_batch_create_update_delete(self):
+        """Пачка заметок создаётся, меняется и удаляется одним запросом."""
+        Note.objects.create(
+            title='Заголовок', text='Текст', author=self.not_author
+        )
+        stale = Note.objects.create(
+            title='Лишняя', text='Текст', author=self.author
+        )
+        response = self.post({
+            'create': [
+                {'title': 'Заголовок', 'text': 'Раз'},
+                {'title': 'Заголовок', 'text': 'Два'},
+                {'title': 'Другой', 'text': 'Три', 'slug': 'own'},
+            ],
+            'update': [{'slug': 'old', 'title': 'Новая', 'text': 'Иначе'}],
+            'delete': [stale.slug],
+        })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        base = slugify('Заголовок')
+        self.assertEqual(response.json(), {
+            'created': [f'{base}-2', f'{base}-3', 'own'],
+            'updated': ['old'],
+            'deleted': 1,
+        })
+        self.note.refresh_from_db()
+        self.assertEqual((self.note.title, self.note.text),
+                         ('Новая', 'Иначе'))
+        self.assertFalse(Note.objects.filter(pk=stale.pk).exists())
+        self.assertEqual(
+            Note.objects.filter(author=self.author).count(), 4
+        )
+
+    def test_batch_queries_do_not_depend_on_size(self):
+        """Число запросов не растёт с размером пакета."""
+        payload = {
+            'create': [{'title': f'Заметка {i}', 'text': 'Текст'}
+                       for i in range(50)],
+            'update': [{'slug': 'old', 'title': 'Новая', 'text': 'Иначе'}],
+            'delete': ['missing'],
+        }
+        # Сессия, пользователь, SAVEPOINT, delete, заметки для изменения,
+        # bulk_update, занятые варианты slug, bulk_create, RELEASE.
+        with self.assertNumQueries(9):
+            response = self.post(payload)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(Note.objects.count(), 51)
+
+    def test_batch_is_atomic(self):
+        """При ошибке в пакете не сохраняется ничего."""
+        Note.objects.create(
+            title='Чужая', text='Текст', author=self.not_author,
+            slug='foreign'
+        )
+        cases = (
+            {'create': [{'title': 'Новая', 'text': ''}]},
+            {'create': [{'title': 'Новая', 'text': 'Т', 'slug': 'foreign'}]},
+            {'create': [{'title': 'А', 'text': 'Т', 'slug': 'x'},
+                        {'title': 'Б', 'text': 'Т', 'slug': 'x'}]},
+            {'update': [{'slug': 'foreign', 'title': 'Т', 'text': 'Т'}]},
+            {'create': 'не список'},
+        )
+        for payload in cases:
+            with self.subTest(payload=payload):
+                response = self.post({'delete': ['old'], **payload})
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.BAD_REQUEST)
+                self.assertIn('errors', response.json())
+                self.assertEqual(Note.objects.count(), 2)
+
+    def test_batch_limit(self):
+        payload = {'delete': ['old'] * 3}
+        with self.settings(NOTES_BATCH_LIMIT=2):
+            response = self.post(payload)
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertTrue(Note.objects.filter(pk=self.note.pk).exists())
+
+    def test_batch_invalid_json(self):
+        response = self.client.post(
+            self.url, data='{', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_export_streams_only_own_notes(self):
+        """Экспорт отдаёт заметки автора потоком JSON Lines."""
+        Note.objects.create(
+            title='Чужая', text='Текст', author=self.not_author
+        )
+        second = Note.objects.create(
+            title='Вторая', text='Ещё', author=self.author
+        )
+        response = self.client.get(self.export_url)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [
+            {'id': note.pk, 'title': note.title, 'text': note.text,
+             'slug': note.slug}
+            for note in (self.note, second)
+        ])
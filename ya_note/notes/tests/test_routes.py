@@ -63,6 +63,10 @@ class TestRoutes(TestCase):
             ('notes:add', None),
             ('notes:success', None),
             ('notes:detail', (self.notes.slug,)),
+            ('notes:search', None),
+            ('notes:search_api', None),
+            ('notes:batch_api', None),
+            ('notes:export_api', None),
         )
         for name, args in urls:
             with self.subTest(name=name):
@@ -74,7 +78,8 @@ class TestRoutes(TestCase):
     def test_page_availability_for_author(self):
         """Проверяем доступность страниц для автора."""
         urls = (
-            'notes:list', 'notes:success', 'notes:add',
+            'notes:list', 'notes:success', 'notes:add', 'notes:search',
+            'notes:search_api', 'notes:export_api',
         )
         for name in urls:
             with self.subTest(name=name):
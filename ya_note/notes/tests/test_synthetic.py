@@ -0,0 +1,59 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from notes.models import Note
+from notes.synthetic import generate
+
+User = get_user_model()
+
+
+def dump_db():
+    return list(Note.objects.order_by('pk').values_list(
+        'title', 'text', 'updated'
+    ))
+
+
+class TestGenerate(TestCase):
+
+    def test_generate_is_deterministic(self):
+        """Одинаковый seed даёт одинаковые данные."""
+        generate(users=5, notes=50, seed=1)
+        expected = dump_db()
+        Note.objects.all().delete()
+        generate(users=5, notes=50, seed=1)
+        self.assertEqual(dump_db(), expected)
+        generate(users=5, notes=50, seed=2)
+        self.assertNotEqual(dump_db(), expected)
+
+    def test_generated_notes(self):
+        """Заметки принадлежат новым пользователям, slug уникальны."""
+        generate(users=5, notes=200)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(
+            Note.objects.values('slug').distinct().count(), 200
+        )
+        self.assertEqual(
+            Note.objects.values('author').distinct().count(), 5
+        )
+
+
+class TestGenerateCommand(TransactionTestCase):
+
+    def test_snapshot_is_reused(self):
+        """Повторный запуск восстанавливает базу из снимка."""
+        with tempfile.TemporaryDirectory() as directory:
+            options = {'users': 5, 'notes': 50, 'snapshot_dir': directory}
+            call_command('generate_data', stdout=StringIO(), **options)
+            expected = dump_db()
+            self.assertEqual(len(list(Path(directory).iterdir())), 1)
+            Note.objects.all().delete()
+            User.objects.all().delete()
+            output = StringIO()
+            call_command('generate_data', stdout=output, **options)
+            self.assertIn('восстановлена из снимка', output.getvalue())
+            self.assertEqual(dump_db(), expected)
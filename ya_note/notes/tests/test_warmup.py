@@ -0,0 +1,26 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.template.loaders.filesystem import Loader
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from yanote import settings_production
+from yanote.warmup import warm_up
+
+User = get_user_model()
+
+
+@override_settings(TEMPLATES=settings_production.TEMPLATES)
+class TestWarmUp(TestCase):
+
+    def test_warm_up_compiles_all_templates(self):
+        """После прогрева страницы не читают шаблоны с диска."""
+        self.client.force_login(User.objects.create(username='Автор'))
+        self.assertGreater(warm_up(), 0)
+        with mock.patch.object(
+            Loader, 'get_contents', side_effect=AssertionError
+        ) as get_contents:
+            for name in ('notes:home', 'notes:add', 'notes:list'):
+                self.client.get(reverse(name))
+        get_contents.assert_not_called()
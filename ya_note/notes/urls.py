@@ -12,4 +12,8 @@ urlpatterns = [
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('api/search/', views.NoteSearchApi.as_view(), name='search_api'),
+    path('api/batch/', views.NoteBatchApi.as_view(), name='batch_api'),
+    path('api/export/', views.NoteExport.as_view(), name='export_api'),
 ]
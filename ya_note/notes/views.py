@@ -1,9 +1,21 @@
+import json
+from hashlib import md5
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest, ValidationError
+from django.db import IntegrityError
+from django.db.models import Count, Max
+from django.http import JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .bulk import apply_batch, export_notes
 from .forms import NoteForm
 from .models import Note
+from .search import search_notes
 
 
 class Home(generic.TemplateView):
@@ -26,15 +38,45 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
+class ConditionalGetMixin:
+    """
+    Ответ 304 на условный GET, если заметки не менялись.
+
+    Представление определяет get_marker: данные, от которых зависит
+    страница, или None, если их нет. Маркер получается одним запросом
+    до построения страницы и вместе с пользователем и версией шаблонов
+    (NOTES_ETAG_VERSION) превращается в ETag.
+    """
+
+    def get_last_modified(self):
+        return None
+
+    def etag(self, request, *args, **kwargs):
+        self.marker = self.get_marker()
+        if self.marker is None:
+            return None
+        key = ':'.join(str(part) for part in (
+            settings.NOTES_ETAG_VERSION, request.user.pk, *self.marker
+        ))
+        return md5(key.encode()).hexdigest()
+
+    def last_modified(self, request, *args, **kwargs):
+        return self.get_last_modified()
+
+    def get(self, request, *args, **kwargs):
+        view = condition(
+            etag_func=self.etag, last_modified_func=self.last_modified
+        )(super().get)
+        return view(request, *args, **kwargs)
+
+
 class NoteCreate(NoteBase, generic.CreateView):
     """Добавление заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
@@ -49,11 +91,137 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
-class NotesList(NoteBase, generic.ListView):
+class NotesList(ConditionalGetMixin, NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_marker(self):
+        """
+        Число и время последнего изменения заметок автора.
+
+        Оба значения считаются по индексу (author_id, updated). Удаление
+        меняет число заметок, создание и правка — время изменения.
+        """
+        stats = super().get_queryset().aggregate(
+            count=Count('id'), updated=Max('updated')
+        )
+        return (
+            self.request.GET.get('after', ''),
+            stats['count'],
+            stats['updated'] and stats['updated'].timestamp(),
+        )
 
-class NoteDetail(NoteBase, generic.DetailView):
+    def get_queryset(self):
+        """
+        Заметки выводятся по возрастанию id, начиная после курсора.
+
+        Курсор — id последней заметки предыдущей страницы, поэтому
+        выборка идёт по индексу (author_id, id) на любой глубине списка.
+        Текст заметок в списке не выводится и не загружается.
+        """
+        queryset = super().get_queryset().only(
+            'title', 'slug'
+        ).order_by('id')
+        after = self.request.GET.get('after')
+        if after:
+            try:
+                queryset = queryset.filter(id__gt=int(after))
+            except ValueError:
+                raise BadRequest('Некорректный курсор.')
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        page_size = settings.NOTES_COUNT_ON_LIST_PAGE
+        notes = list(self.object_list[:page_size + 1])
+        next_cursor = None
+        if len(notes) > page_size:
+            next_cursor = notes[page_size - 1].pk
+        context = super().get_context_data(
+            object_list=notes[:page_size], **kwargs
+        )
+        context['next_cursor'] = next_cursor
+        return context
+
+
+class NoteDetail(ConditionalGetMixin, NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+    def get_marker(self):
+        """id и время изменения заметки, без загрузки её текста."""
+        return self.get_queryset().filter(
+            slug=self.kwargs['slug']
+        ).values_list('id', 'updated').first()
+
+    def get_last_modified(self):
+        return self.marker and self.marker[1]
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        return search_notes(
+            self.request.user,
+            self.request.GET.get('q', ''),
+            settings.NOTES_SEARCH_LIMIT
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+class NoteSearchApi(NoteSearch):
+    """Поиск по заметкам пользователя в формате JSON."""
+
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse({
+            'query': context['query'],
+            'results': [
+                {'id': note.pk, 'title': note.title, 'slug': note.slug}
+                for note in context['object_list']
+            ],
+        })
+
+
+class NoteBatchApi(NoteBase, generic.View):
+    """Создание, изменение и удаление пачки заметок одним запросом."""
+
+    def post(self, request, *args, **kwargs):
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            raise BadRequest('Некорректный JSON.')
+        try:
+            result = apply_batch(request.user, payload)
+        except ValidationError as error:
+            errors = (error.message_dict if hasattr(error, 'error_dict')
+                      else {'__all__': error.messages})
+            return JsonResponse(
+                {'errors': errors}, status=HTTPStatus.BAD_REQUEST
+            )
+        except IntegrityError:
+            return JsonResponse(
+                {'errors': {'__all__': ['Slug заняли параллельно, '
+                                        'повторите запрос.']}},
+                status=HTTPStatus.CONFLICT
+            )
+        return JsonResponse(result)
+
+
+class NoteExport(NoteBase, generic.View):
+    """Все заметки пользователя потоком JSON Lines."""
+
+    def get(self, request, *args, **kwargs):
+        lines = (
+            json.dumps(note, ensure_ascii=False) + '\n'
+            for note in export_notes(request.user)
+        )
+        response = StreamingHttpResponse(
+            lines, content_type='application/x-ndjson; charset=utf-8'
+        )
+        response['Content-Disposition'] = 'attachment; filename="notes.jsonl"'
+        return response
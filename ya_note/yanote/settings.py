@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanote.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -35,7 +37,9 @@ ROOT_URLCONF = 'yanote.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, который замеряет время отрисовки для метрик
+        # запроса (см. INSTRUMENTATION_ENABLED).
+        'BACKEND': 'yanote.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -52,11 +56,44 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# YANOTE_DB_ENGINE=postgres переключает проект на PostgreSQL
+# (нужен пакет psycopg2), по умолчанию используется файл SQLite.
+if os.getenv('YANOTE_DB_ENGINE', 'sqlite') == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('YANOTE_DB_NAME', 'yanote'),
+            'USER': os.getenv('YANOTE_DB_USER', 'yanote'),
+            'PASSWORD': os.getenv('YANOTE_DB_PASSWORD', ''),
+            'HOST': os.getenv('YANOTE_DB_HOST', 'localhost'),
+            'PORT': os.getenv('YANOTE_DB_PORT', '5432'),
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'yanote.sqlite3',
+            'NAME': os.getenv('YANOTE_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # Снимки мигрированной тестовой базы, см. yanote/sqlite3.
+            'TEST': {
+                'SNAPSHOT_DIR': os.getenv(
+                    'YANOTE_TEST_DB_SNAPSHOT_DIR', BASE_DIR / '.test_db_cache'
+                ),
+            },
+        }
+    }
+DATABASES['default'].update(
+    CONN_MAX_AGE=int(os.getenv('YANOTE_CONN_MAX_AGE', '0')),
+)
+
+# Применяются к каждому новому соединению с SQLite (см. yanote/sqlite3).
+# WAL позволяет читать во время записи, а busy_timeout — ждать
+# освобождения базы вместо ошибки «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.getenv('YANOTE_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'busy_timeout': int(os.getenv('YANOTE_SQLITE_BUSY_TIMEOUT', 20_000)),
 }
 
 
@@ -85,5 +122,35 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Метрики каждого запроса в заголовке Server-Timing и в логе.
+INSTRUMENTATION_ENABLED = os.getenv('YANOTE_INSTRUMENTATION', 'False') == 'True'
+# Сколько раз должен повториться один SQL, чтобы считаться N+1.
+INSTRUMENTATION_N_PLUS_ONE = int(os.getenv('YANOTE_N_PLUS_ONE_THRESHOLD', '10'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yanote.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# При True шаблоны и URLconf загружаются при старте воркера.
+WARM_UP_ON_START = False
+
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 10
+NOTES_SEARCH_LIMIT = 50
+NOTES_BATCH_LIMIT = 1000
+# Входит в ETag страниц заметок. Меняется при выкладке, которая меняет
+# шаблоны или заголовки ответов, чтобы браузеры не получили 304
+# со старой версией страницы.
+NOTES_ETAG_VERSION = os.getenv('YANOTE_ETAG_VERSION', '1')
@@ -0,0 +1,45 @@
+"""
+Настройки для работы под нагрузкой.
+
+Шаблоны кешируются после первой загрузки, а при старте воркера
+все шаблоны компилируются заранее (см. yanote/warmup.py).
+Соединения с базой живут CONN_MAX_AGE секунд. Остальное, включая
+выбор базы, задаётся переменными окружения в settings.py.
+Подключаются через DJANGO_SETTINGS_MODULE=yanote.settings_production.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import ALLOWED_HOSTS, DATABASES, TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv(
+    'YANOTE_ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)
+).split(',')
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+WARM_UP_ON_START = True
+
+# Соединения с базой переиспользуются между запросами.
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': int(os.getenv('YANOTE_CONN_MAX_AGE', '60')),
+    }
+}
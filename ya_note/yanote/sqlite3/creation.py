@@ -0,0 +1,79 @@
+import hashlib
+import os
+import sqlite3
+import sys
+
+from django.db.backends.sqlite3 import creation
+from django.db.migrations.loader import MigrationLoader
+
+
+def migrations_hash():
+    """Хеш имён и содержимого файлов всех миграций проекта."""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    digest = hashlib.md5()
+    for key, migration in sorted(loader.disk_migrations.items()):
+        digest.update(repr(key).encode())
+        with open(sys.modules[migration.__module__].__file__, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """
+    Тестовая база из снимка уже мигрированной базы.
+
+    Снимки лежат в каталоге TEST['SNAPSHOT_DIR'] настроек базы, имя
+    снимка — хеш файлов миграций. Если снимок есть, он копируется
+    в новую тестовую базу, и migrate только убеждается, что все
+    миграции применены. Иначе база мигрируется как обычно и сохраняется
+    снимком для следующих запусков и параллельных процессов.
+    """
+
+    def snapshot_path(self):
+        test_settings = self.connection.settings_dict['TEST']
+        directory = test_settings.get('SNAPSHOT_DIR')
+        if not directory or test_settings.get('MIGRATE') is False:
+            return None
+        return os.path.join(directory, f'{migrations_hash()}.sqlite3')
+
+    def create_test_db(self, verbosity=1, autoclobber=False, serialize=True,
+                       keepdb=False):
+        self.snapshot = None if keepdb else self.snapshot_path()
+        self.restored = None
+        try:
+            name = super().create_test_db(
+                verbosity, autoclobber, serialize, keepdb
+            )
+        finally:
+            if self.restored is not None:
+                self.restored.close()
+        if self.snapshot and self.restored is None:
+            self.save_snapshot(self.snapshot)
+        return name
+
+    def _create_test_db(self, verbosity, autoclobber, keepdb=False):
+        name = super()._create_test_db(verbosity, autoclobber, keepdb)
+        if self.snapshot and os.path.exists(self.snapshot):
+            target = sqlite3.connect(name, uri=True)
+            source = sqlite3.connect(self.snapshot)
+            try:
+                source.backup(target)
+            finally:
+                source.close()
+            # Открытое соединение не даёт исчезнуть базе в памяти,
+            # пока к ней не подключится сам Django.
+            self.restored = target
+            if verbosity >= 1:
+                self.log(f'Restored test database from {self.snapshot}')
+        return name
+
+    def save_snapshot(self, path):
+        """Снимок пишется во временный файл и атомарно переименовывается."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        target = sqlite3.connect(temporary)
+        try:
+            self.connection.connection.backup(target)
+        finally:
+            target.close()
+        os.replace(temporary, path)